@@ -4,6 +4,8 @@ import math
 import sys
 import tomllib, os
 
+from .board import CLASSIC_RAILS
+
 with open(os.path.join("core",'gameconfig.toml'), 'rb') as conf:
     GAME_CONFIGS = tomllib.load(conf)
     VIEW = GAME_CONFIGS['view_parameters']
@@ -16,6 +18,18 @@ SCREEN_HEIGHT = VIEW['SCREEN_HEIGHT']
 PEG_RADIUS = VIEW['PEG_RADIUS']
 FPS = VIEW['FPS']
 
+# Bumped whenever Ball.update or the board sizes derived from a [board]
+# config change what a play does, so precomputed outcome tables and cached
+# slot odds from older physics are not reused
+PHYSICS_VERSION = 3
+
+def draw_ball(screen, x, y, color, radius, highlight=True):
+    pygame.draw.circle(screen, color, (int(x), int(y)), radius)
+    # simple highlight
+    if highlight:
+        pygame.draw.circle(screen, COLORS['WHITE'], (int(x - 2), int(y - 2)), 3)
+
+
 class Ball:
     def __init__(self, x, y, vx=0, vy=0, follow_ramp=False, rng=None):
         self.x = x
@@ -34,6 +48,8 @@ class Ball:
         self.friction = BALLPHYSICS['friction']
         self.active = True
         self.ramp_t = 0.0
+        # Peg contacts so far, for board benchmarks
+        self.contacts = 0
 
         # For ramp behavior
         self.follow_ramp = follow_ramp
@@ -94,22 +110,31 @@ class Ball:
         # Normal physics
         self.vy += self.gravity
         self.vx *= self.friction
-        self.x += self.vx
-        self.y += self.vy
 
-        self.vx *= 0.99
-        self.vy *= 0.99
+        # A ball may only move less than the contact distance between two peg
+        # tests, or it could pass straight through a peg; fast balls (and
+        # the small pegs of dense boards) take several substeps per frame
+        peg_radius = getattr(pegs, 'peg_radius', PEG_RADIUS)
+        substeps = int(math.hypot(self.vx, self.vy) / (self.radius + peg_radius)) + 1
+        for i in range(substeps):
+            self.x += self.vx / substeps
+            self.y += self.vy / substeps
 
+            if i == 0:
+                self.vx *= 0.99
+                self.vy *= 0.99
+
+            self.collide(pegs, peg_radius)
+
+    def collide(self, pegs, peg_radius):
         # Screen side collisions
-        # Rail collisions
-        top_y = 150
-        bottom_y = SCREEN_HEIGHT - 80
-        rail_offset_x = 200
+        # Rail collisions; a Board brings its own rails, a bare peg list the classic ones
+        top_y, bottom_y, top_left_x, top_right_x, bottom_left_x, bottom_right_x = getattr(pegs, 'rails', CLASSIC_RAILS)
 
         # Left rail slope equation
         if self.y >= top_y and self.y <= bottom_y:
-            left_x_at_y = (SCREEN_WIDTH//2 - rail_offset_x) - ((SCREEN_WIDTH//2 - rail_offset_x) / (bottom_y - top_y)) * (self.y - top_y)
-            right_x_at_y = (SCREEN_WIDTH//2 + rail_offset_x) + ((SCREEN_WIDTH - (SCREEN_WIDTH//2 + rail_offset_x)) / (bottom_y - top_y)) * (self.y - top_y)
+            left_x_at_y = top_left_x - ((top_left_x - bottom_left_x) / (bottom_y - top_y)) * (self.y - top_y)
+            right_x_at_y = top_right_x + ((bottom_right_x - top_right_x) / (bottom_y - top_y)) * (self.y - top_y)
 
             if self.x - self.radius < left_x_at_y:
                 self.x = left_x_at_y + self.radius
@@ -126,18 +151,22 @@ class Ball:
             self.x = SCREEN_WIDTH - self.radius
             self.vx = -self.vx * self.bounce
 
-        # Collision with pegs
-        for peg in pegs:
+        # Collision with pegs; a Board narrows this to the pegs around the ball
+        nearby = pegs.near(self.x, self.y) if hasattr(pegs, 'near') else pegs
+        # Dense boards cap the speed a bounce can leave a ball with
+        max_speed = getattr(pegs, 'max_speed', None)
+        for peg in nearby:
             dx = self.x - peg[0]
             dy = self.y - peg[1]
             dist = math.hypot(dx, dy)
             if dist == 0:
                 continue
-            if dist < self.radius + PEG_RADIUS:
+            if dist < self.radius + peg_radius:
+                self.contacts += 1
                 # Normalize
                 nx = dx / dist
                 ny = dy / dist
-                overlap = self.radius + PEG_RADIUS - dist
+                overlap = self.radius + peg_radius - dist
                 # Separate
                 self.x += nx * overlap
                 self.y += ny * overlap
@@ -149,10 +178,16 @@ class Ball:
                 self.vx *= 0.9
                 self.vy *= self.bounce
                 self.vx += self.rng.uniform(-0.3, 0.3)
+                if max_speed is not None:
+                    speed = math.hypot(self.vx, self.vy)
+                    if speed > max_speed:
+                        self.vx *= max_speed / speed
+                        self.vy *= max_speed / speed
+
+    def snapshot(self):
+        return (self.x, self.y, self.color, self.radius, self.active)
 
     def draw(self, screen):
         if not self.active:
             return
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
-        # simple highlight
-        pygame.draw.circle(screen, COLORS['WHITE'], (int(self.x - 2), int(self.y - 2)), 3)
\ No newline at end of file
+        draw_ball(screen, self.x, self.y, self.color, self.radius)
\ No newline at end of file
@@ -0,0 +1,268 @@
+import pygame
+import tomllib, os
+
+with open(os.path.join("core",'gameconfig.toml'), 'rb') as conf:
+    GAME_CONFIGS = tomllib.load(conf)
+    VIEW = GAME_CONFIGS['view_parameters']
+    COLORS = GAME_CONFIGS['colormaps']
+    PEG_DISTANCE = GAME_CONFIGS['peg_distances']
+    BOARD = GAME_CONFIGS['board']
+
+
+SCREEN_WIDTH = VIEW['SCREEN_WIDTH']
+SCREEN_HEIGHT = VIEW['SCREEN_HEIGHT']
+PEG_RADIUS = VIEW['PEG_RADIUS']
+
+# Board layout shared by the pygame front end and the headless server.
+# Nothing in here needs a display; drawing goes to any Surface.
+BASE_SLOT_WIDTH = 80
+LANDING_Y = SCREEN_HEIGHT - 100
+LAUNCHER_X = 80
+LAUNCHER_Y = SCREEN_HEIGHT // 2 + 60
+NO_PRIZE = ("No Prize", 0, COLORS['BLACK'], 1.0)
+
+# The hand-tuned rails of the original 12-row board:
+# collision (top_y, bottom_y, top_left_x, top_right_x, bottom_left_x, bottom_right_x)
+# and the slightly different lines that are drawn for them.
+CLASSIC_RAILS = (150, SCREEN_HEIGHT - 80, SCREEN_WIDTH//2 - 200, SCREEN_WIDTH//2 + 200, 0, SCREEN_WIDTH)
+CLASSIC_RAIL_LINES = (
+    ((SCREEN_WIDTH//2 - 200, 120), (0, SCREEN_HEIGHT - 90)),
+    ((SCREEN_WIDTH//2 + 200, 120), (SCREEN_WIDTH, SCREEN_HEIGHT - 90)),
+)
+
+# Margins used when a spacing is derived ("auto") to fit the screen
+AUTO_MARGIN_X = 40
+AUTO_MARGIN_BOTTOM = 40
+
+# Proportions of the classic board that derived ("auto") sizes keep
+CLASSIC_ASPECT = PEG_DISTANCE['v_spacing'] / PEG_DISTANCE['h_spacing']
+CLASSIC_CONTACT = 2 * PEG_RADIUS / PEG_DISTANCE['h_spacing']
+# Fastest a ball may leave a peg, per row spacing, on boards denser than the
+# classic one (about the fastest it ever moves there: 11 px/frame at 32 px
+# rows). bounce > 1 adds energy on every contact, and with rows only a few
+# pixels apart contacts come so often that balls would fly off the board.
+MAX_SPEED_PER_ROW = 0.35
+
+
+def load_board_config(path=None):
+    """[board] table from gameconfig.toml, overridden by the [board] table of path"""
+    config = dict(BOARD)
+    config.setdefault('h_spacing', PEG_DISTANCE['h_spacing'])
+    config.setdefault('v_spacing', PEG_DISTANCE['v_spacing'])
+    config.setdefault('peg_radius', PEG_RADIUS)
+    config.setdefault('ball_radius', PEG_RADIUS)
+    if path is not None:
+        with open(path, 'rb') as f:
+            config.update(tomllib.load(f)['board'])
+    return config
+
+
+def load_board(path=None):
+    return Board(load_board_config(path))
+
+
+def load_prize_arrangement():
+    #preload prize_array
+    with open(os.path.join('core','prize_arrangement.toml'), 'rb') as f:
+        data = tomllib.load(f)
+    return data['prize_array']
+
+
+def classic_reward_slots():
+    pz_arr = load_prize_arrangement()
+
+    very_common_color = (122, 215, 81)
+    common_color = (68, 191, 112)
+    uncommon_color = (52, 94, 141)
+    grand_prize_color = (189, 223, 38)
+
+    rewards = [
+        (pz_arr['p1'], 20, grand_prize_color, 1.0),
+        (pz_arr['p2'], 30, uncommon_color, 1.0),
+        (pz_arr['p3'], 40, common_color, 1.0),
+        (pz_arr['p4'], 50, very_common_color, 1.0),
+        (pz_arr['p5'], 20, common_color, 1.0),
+        (pz_arr['p6'], 30, uncommon_color, 1.0),
+        (pz_arr['p7'], 20, grand_prize_color, 1.0)
+    ]
+    return rewards
+
+
+class Board:
+    """Pegs, rails and reward slots generated from a [board] config.
+
+    Spacings, radii, jitter and slot width may be "auto", in which case they
+    are derived from rows/slots so the board fits the screen. Pegs are also
+    bucketed into a uniform grid so a ball only tests the handful of pegs
+    around it, whatever the size of the board. Iterating a Board yields its
+    pegs, so it can be passed anywhere a peg list was used before.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.rows = config['rows']
+        self.first_row_pegs = config['first_row_pegs']
+        self.start_y = config['start_y']
+        last_row_pegs = self.first_row_pegs + self.rows - 1
+
+        v_spacing = config['v_spacing']
+        if v_spacing == "auto":
+            v_spacing = (LANDING_Y - AUTO_MARGIN_BOTTOM - self.start_y) / max(self.rows - 1, 1)
+        h_spacing = config['h_spacing']
+        if h_spacing == "auto":
+            # Never flatter than the classic board, or a ball cannot pass
+            # between a peg and the pegs diagonally below it
+            h_spacing = min((SCREEN_WIDTH - 2 * AUTO_MARGIN_X) / (last_row_pegs + 1), v_spacing / CLASSIC_ASPECT)
+        self.h_spacing = h_spacing
+        self.v_spacing = v_spacing
+        jitter = config['jitter'] if config['jitter'] != "auto" else h_spacing / 9
+
+        # Auto radii keep the classic contact distance per spacing: wide enough
+        # that a ball falling straight down always meets a peg (the rows'
+        # pegs, offset by half a spacing and the jitter, leave no free
+        # column), while a ball still fits between two pegs of a row
+        contact = max(CLASSIC_CONTACT * h_spacing, h_spacing / 4 + abs(jitter))
+        self.peg_radius = config['peg_radius'] if config['peg_radius'] != "auto" else contact / 2
+        self.ball_radius = config['ball_radius'] if config['ball_radius'] != "auto" else contact / 2
+        self.max_speed = MAX_SPEED_PER_ROW * v_spacing if v_spacing < PEG_DISTANCE['v_spacing'] else None
+
+        self.pegs = self.create_pegs(jitter)
+        self.rails, self.rail_lines = self.create_rails(config['rails'])
+        self.reward_slots = self.create_reward_slots(config['slots'], config['slot_width'])
+
+        # Any peg a ball can touch within one step lies in the 3x3 cells around
+        # it as long as cells are at least twice the contact distance
+        self.cell = 2 * (self.peg_radius + self.ball_radius)
+        self.grid = {}
+        for index, peg in enumerate(self.pegs):
+            key = (int(peg[0] // self.cell), int(peg[1] // self.cell))
+            self.grid.setdefault(key, []).append((index, peg))
+        self.neighbourhoods = {}
+
+    def __iter__(self):
+        return iter(self.pegs)
+
+    def __len__(self):
+        return len(self.pegs)
+
+    def create_pegs(self, jitter):
+        pegs = []
+        for row in range(self.rows):
+            y = self.start_y + row * self.v_spacing
+            pegs_in_row = self.first_row_pegs + row
+            start_x = SCREEN_WIDTH // 2 - (pegs_in_row - 1) * (self.h_spacing / 2)
+            # Deterministic jitter based on seed
+            row_jitter = jitter if row % 2 == 0 else -jitter
+            for i in range(pegs_in_row):
+                x = start_x + i * self.h_spacing
+                pegs.append((int(x + row_jitter), int(y)))
+        return pegs
+
+    def create_rails(self, style):
+        if style == "classic":
+            return CLASSIC_RAILS, CLASSIC_RAIL_LINES
+
+        # Follow the sides of the peg triangle, one spacing outside it
+        top_y = self.start_y - self.v_spacing
+        bottom_y = SCREEN_HEIGHT - 80
+        top_half = ((self.first_row_pegs - 1) / 2 + 1) * self.h_spacing
+        spread = (bottom_y - top_y) * (self.h_spacing / 2) / self.v_spacing
+        top_left_x = SCREEN_WIDTH // 2 - top_half
+        top_right_x = SCREEN_WIDTH // 2 + top_half
+        bottom_left_x = max(0, top_left_x - spread)
+        bottom_right_x = min(SCREEN_WIDTH, top_right_x + spread)
+        rails = (top_y, bottom_y, top_left_x, top_right_x, bottom_left_x, bottom_right_x)
+        lines = (
+            ((top_left_x, top_y), (bottom_left_x, bottom_y)),
+            ((top_right_x, top_y), (bottom_right_x, bottom_y)),
+        )
+        return rails, lines
+
+    def create_reward_slots(self, count, slot_width):
+        classic = classic_reward_slots()
+        if slot_width == "auto":
+            span = self.rails[5] - self.rails[4]
+            slot_width = min(SCREEN_WIDTH, span) / count
+        width_mult = slot_width / BASE_SLOT_WIDTH
+        if count == len(classic) and width_mult == 1.0:
+            return classic
+
+        # Stretch the classic left-to-right arrangement across `count` slots,
+        # keeping the grand prizes at the edges
+        slots = []
+        for i in range(count):
+            j = round(i * (len(classic) - 1) / max(count - 1, 1))
+            name, points, color, _ = classic[j]
+            slots.append((name, points, color, width_mult))
+        return slots
+
+    def near(self, x, y):
+        """Pegs in the 3x3 grid cells around (x, y), in board order"""
+        key = (int(x // self.cell), int(y // self.cell))
+        pegs = self.neighbourhoods.get(key)
+        if pegs is None:
+            cx, cy = key
+            found = []
+            for gx in (cx - 1, cx, cx + 1):
+                for gy in (cy - 1, cy, cy + 1):
+                    found.extend(self.grid.get((gx, gy), ()))
+            # Board order keeps collision resolution identical to a full scan
+            found.sort()
+            pegs = self.neighbourhoods[key] = [peg for _, peg in found]
+        return pegs
+
+    def draw(self, surface, layered_pegs=True):
+        # Derived radii can be fractional or under a pixel; draw at least one
+        radius = max(1, round(self.peg_radius))
+        if layered_pegs:
+            for peg in self.pegs:
+                pygame.draw.circle(surface, COLORS['WHITE'], peg, radius)
+                if radius > 2:
+                    pygame.draw.circle(surface, COLORS['SILVER'], peg, radius - 2)
+        else:
+            for peg in self.pegs:
+                pygame.draw.circle(surface, COLORS['SILVER'], peg, radius)
+
+        slot_y = SCREEN_HEIGHT - 80
+        total_width = sum(BASE_SLOT_WIDTH * mult for _, _, _, mult in self.reward_slots)
+        current_x = (SCREEN_WIDTH - total_width) / 2
+        for reward, points, color, width_mult in self.reward_slots:
+            slot_width = BASE_SLOT_WIDTH * width_mult
+            pygame.draw.rect(surface, color, (current_x, slot_y, slot_width, 80))
+            pygame.draw.rect(surface, COLORS['BLACK'], (current_x, slot_y, slot_width, 80), 2)
+            current_x += slot_width
+
+        for start, end in self.rail_lines:
+            pygame.draw.line(surface, COLORS['WHITE'], start, end, 4)
+
+
+def slot_index_at(x, reward_slots):
+    """Index of the reward slot under x, or None if x falls outside the slots"""
+    total_width = sum(BASE_SLOT_WIDTH * slot[3] for slot in reward_slots)
+    current_x = (SCREEN_WIDTH - total_width) / 2
+    for i, slot in enumerate(reward_slots):
+        slot_width = BASE_SLOT_WIDTH * slot[3]
+        if current_x <= x < current_x + slot_width:
+            return i
+        current_x += slot_width
+    return None
+
+
+def is_landed(ball):
+    return ball.y > LANDING_Y
+
+
+def is_lost(ball):
+    return ball.x < -200 or ball.x > SCREEN_WIDTH + 200 or ball.y < -200 or ball.y > SCREEN_HEIGHT + 400
+
+
+def step_ball(ball, pegs):
+    """Advance a ball one step; returns 'failed', 'landed', 'lost' or None while in flight"""
+    ball.update(pegs)
+    if not ball.active:
+        return 'failed'
+    if is_landed(ball):
+        return 'landed'
+    if is_lost(ball):
+        return 'lost'
+    return None
@@ -0,0 +1,126 @@
+import argparse
+import os
+import sys
+import time
+
+# Headless before pygame is imported anywhere
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+import pygame
+
+from .board import Board, load_board_config, step_ball, SCREEN_WIDTH, SCREEN_HEIGHT
+from .simulation import launch_ball, MAX_STEPS
+from .rng import play_rng
+
+# Per-board-size benchmark for generated boards:
+#
+#   python -m core.board_bench --rows 12 40 100 200 --board core/boards/stage.toml
+#
+# Reports startup (generation + grid), collision cost per physics step with
+# the grid and with a full peg scan, how many plays land and how many hit
+# MAX_STEPS, peg contacts per row (a board whose pegs the balls barely touch
+# is not worth its step time), static board render time and the per-frame
+# cost of blitting the pre-rendered board. Exits non-zero if any board does
+# not play: fewer than MIN_LANDED of its plays land, or balls average fewer
+# than MIN_CONTACTS_PER_ROW peg contacts per row.
+
+MIN_LANDED = 0.95
+MIN_CONTACTS_PER_ROW = 1.0
+
+
+class FullScan:
+    """Same board without the grid, for comparison"""
+
+    def __init__(self, board):
+        self.pegs = board.pegs
+        self.rails = board.rails
+        self.peg_radius = board.peg_radius
+        self.max_speed = board.max_speed
+
+    def __iter__(self):
+        return iter(self.pegs)
+
+
+def generated_config(rows):
+    config = load_board_config()
+    config.update({
+        'rows': rows, 'start_y': 150, 'slots': max(7, rows // 2 + 1),
+        'h_spacing': "auto", 'v_spacing': "auto", 'peg_radius': "auto",
+        'ball_radius': "auto", 'jitter': "auto", 'slot_width': "auto", 'rails': "derived",
+    })
+    return config
+
+
+def time_steps(board, pegs, plays):
+    """us per step, steps per play, contacts per row, landed plays, timed-out plays"""
+    steps = 0
+    contacts = 0
+    landed = 0
+    timeouts = 0
+    started = time.perf_counter()
+    for play in range(1, plays + 1):
+        ball = launch_ball(8.0 + play % 12, play_rng(1, play), board)
+        status = None
+        # Capped per play, so one stuck ball cannot starve the others
+        play_steps = 0
+        while status is None and play_steps < MAX_STEPS:
+            status = step_ball(ball, pegs)
+            play_steps += 1
+        steps += play_steps
+        contacts += ball.contacts
+        landed += status == 'landed'
+        timeouts += status is None
+    return ((time.perf_counter() - started) / steps * 1e6, steps / plays,
+            contacts / plays / board.rows, landed, timeouts)
+
+
+def bench(label, config, plays, frames):
+    """Prints one table row; returns True if the board plays"""
+    started = time.perf_counter()
+    board = Board(config)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    grid_us, steps, contacts, landed, timeouts = time_steps(board, board, plays)
+    scan_us = time_steps(board, FullScan(board), plays)[0]
+
+    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    started = time.perf_counter()
+    board.draw(surface)
+    render_ms = (time.perf_counter() - started) * 1000
+
+    screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    started = time.perf_counter()
+    for _ in range(frames):
+        screen.blit(surface, (0, 0))
+    frame_ms = (time.perf_counter() - started) / frames * 1000
+
+    print(f"{label:>10} {len(board):>7} {len(board.reward_slots):>6} {build_ms:>9.1f} "
+          f"{grid_us:>9.1f} {scan_us:>9.1f} {steps:>7.0f} {landed / plays:>7.0%} {timeouts:>8} "
+          f"{contacts:>8.2f} {render_ms:>10.1f} {frame_ms:>9.3f}")
+    return landed / plays >= MIN_LANDED and contacts >= MIN_CONTACTS_PER_ROW
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark generated boards by size")
+    parser.add_argument('--rows', type=int, nargs='*', default=[12, 40, 100, 200])
+    parser.add_argument('--board', nargs='*', default=[], help="board TOMLs to benchmark as well")
+    parser.add_argument('--plays', type=int, default=10)
+    parser.add_argument('--frames', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'board':>10} {'pegs':>7} {'slots':>6} {'build ms':>9} {'grid us':>9} {'scan us':>9} "
+          f"{'steps':>7} {'landed':>7} {'timeouts':>8} {'cont/row':>8} {'render ms':>10} {'frame ms':>9}")
+    failed = []
+    boards = [("classic", load_board_config())]
+    boards += [(f"{rows} rows", generated_config(rows)) for rows in args.rows]
+    boards += [(os.path.splitext(os.path.basename(path))[0], load_board_config(path)) for path in args.board]
+    for label, config in boards:
+        if not bench(label, config, args.plays, args.frames):
+            failed.append(label)
+    if failed:
+        print(f"\nDoes not play (under {MIN_LANDED:.0%} landed or {MIN_CONTACTS_PER_ROW} contacts per row): "
+              f"{', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
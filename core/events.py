@@ -0,0 +1,66 @@
+import time
+from collections import deque
+
+import pygame
+
+# Event types PlinkoGame reacts to. SDL drops everything else before it
+# reaches the queue. TEXTINPUT stays allowed because the prize editor runs
+# in text-input mode.
+ALLOWED_EVENTS = (
+    pygame.QUIT,
+    pygame.KEYDOWN,
+    pygame.TEXTINPUT,
+    pygame.MOUSEBUTTONDOWN,
+    pygame.MOUSEBUTTONUP,
+    pygame.MOUSEMOTION,
+    pygame.WINDOWEXPOSED,
+)
+
+# Press-to-launch samples kept for the latency summary
+LATENCY_SAMPLES = 1000
+
+
+def coalesce_motion(events):
+    """Keep only the latest MOUSEMOTION, in its place; other events keep their order"""
+    last_motion = None
+    for i, event in enumerate(events):
+        if event.type == pygame.MOUSEMOTION:
+            last_motion = i
+    if last_motion is None:
+        return events
+    return [event for i, event in enumerate(events)
+            if event.type != pygame.MOUSEMOTION or i == last_motion]
+
+
+class InputPipeline:
+    """Drains SDL's queue once per frame.
+
+    Only ALLOWED_EVENTS are queued at all. Each frame's motion burst is cut to
+    its latest position, and every event is stamped with `received`, the
+    perf_counter time it was drained. pygame 2 does not expose SDL's own event
+    timestamps, so that is the earliest time we can measure from. Launch
+    latencies recorded against those stamps are kept for `latency_summary`.
+    """
+
+    def __init__(self):
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(list(ALLOWED_EVENTS))
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def poll(self):
+        events = coalesce_motion(pygame.event.get())
+        received = time.perf_counter()
+        for event in events:
+            event.received = received
+        return events
+
+    def record_latency(self, seconds):
+        self.latencies.append(seconds)
+
+    def latency_summary(self):
+        """(samples, median ms, p95 ms, max ms), or None before the first launch"""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        n = len(ordered)
+        return (n, ordered[n // 2] * 1000, ordered[min(n - 1, int(n * 0.95))] * 1000, ordered[-1] * 1000)
@@ -0,0 +1,212 @@
+import argparse
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import namedtuple
+from statistics import NormalDist
+import tomllib, os
+
+from .ball import PHYSICS_VERSION
+from .board import load_board
+from .simulation import simulate_play
+
+with open(os.path.join("core",'gameconfig.toml'), 'rb') as conf:
+    GAME_CONFIGS = tomllib.load(conf)
+    FORECAST = GAME_CONFIGS['forecast']
+
+
+# Seed of the fixed play streams used to estimate slot odds
+ODDS_SEED = 20240101
+# The exact quantile walks every play up to the answer; above this stock it
+# is replaced by a normal approximation, and above this many expected plays
+# (rare prizes) by a gamma approximation
+EXACT_STOCK_LIMIT = 200
+EXACT_PLAYS_LIMIT = 10000
+
+Forecast = namedtuple('Forecast', ['prize', 'stock', 'odds', 'expected', 'low', 'high'])
+
+
+def estimate_slot_odds(board, samples, power_min, power_max):
+    """Landing probability of each slot over launches spread evenly across the power range.
+
+    Launches that never clear the tube are not plays and are left out; balls
+    that land outside every slot count towards no slot.
+    """
+    counts = [0] * len(board.reward_slots)
+    plays = 0
+    for i in range(samples):
+        power = power_min + (power_max - power_min) * (i + 0.5) / samples
+        result = simulate_play(ODDS_SEED, i + 1, power, board)
+        if result['status'] == 'failed':
+            continue
+        plays += 1
+        if result['slot'] is not None:
+            counts[result['slot']] += 1
+    return [count / plays for count in counts] if plays else counts, plays
+
+
+def gamma_cdf(shape, rate, x):
+    """P(Gamma(shape, rate) <= x) for integer shape, via the Poisson tail"""
+    mu = rate * x
+    if mu <= 0:
+        return 0.0
+    log_mu = math.log(mu)
+    below = sum(math.exp(-mu + k * log_mu - math.lgamma(k + 1)) for k in range(shape))
+    return max(0.0, 1.0 - below)
+
+
+def plays_quantile(stock, odds, p):
+    """Smallest n with P(stock-th win by play n) >= p (negative binomial)"""
+    if stock <= 0:
+        return 0
+    if odds <= 0:
+        return math.inf
+    if odds >= 1:
+        return stock
+    if stock > EXACT_STOCK_LIMIT:
+        mean = stock / odds
+        sd = math.sqrt(stock * (1 - odds)) / odds
+        return max(stock, math.ceil(mean + NormalDist().inv_cdf(p) * sd))
+    if stock / odds > EXACT_PLAYS_LIMIT:
+        # Plays between wins are geometric, close to exponential at these odds,
+        # so the stock-th win is about Gamma(stock, rate); bisect its CDF
+        rate = -math.log1p(-odds)
+        low, high = 0.0, (stock + 10 * math.sqrt(stock) + 10) / rate
+        while high - low > 1:
+            mid = (low + high) / 2
+            if gamma_cdf(stock, rate, mid) < p:
+                low = mid
+            else:
+                high = mid
+        return max(stock, math.ceil(high))
+
+    # P(N = n) = C(n-1, stock-1) odds^stock (1-odds)^(n-stock), summed from n = stock
+    log_miss = math.log1p(-odds)
+    log_pmf = stock * math.log(odds)
+    n = stock
+    cdf = math.exp(log_pmf)
+    while cdf < p:
+        log_pmf += math.log(n) - math.log(n - stock + 1) + log_miss
+        n += 1
+        cdf += math.exp(log_pmf)
+    return n
+
+
+class StockoutForecaster:
+    """Predicts how many plays each prize will last.
+
+    Slot odds for the board are simulated once, on a background thread, and
+    cached on disk by board config. After that a forecast is only a few
+    negative-binomial quantiles per prize, cheap enough to rerun after every
+    award. Bands widen by the sampling error of the simulated odds.
+    """
+
+    def __init__(self, board, samples=FORECAST['samples'], cache_path=FORECAST['cache_path']):
+        self.board = board
+        self.samples = samples
+        self.cache_path = cache_path
+        self.slot_odds = None
+        self.odds_plays = 0
+        self.thread = None
+
+    @property
+    def ready(self):
+        return self.slot_odds is not None
+
+    def cache_key(self):
+        key = json.dumps([PHYSICS_VERSION, self.board.config, self.board.reward_slots, self.samples,
+                          FORECAST['power_min'], FORECAST['power_max']], sort_keys=True, default=str)
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.load_odds, name="plinko-forecast", daemon=True)
+        self.thread.start()
+
+    def load_odds(self):
+        key = self.cache_key()
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+            if cached['key'] == key:
+                self.odds_plays = cached['plays']
+                self.slot_odds = cached['slot_odds']
+                return
+        except (OSError, ValueError, KeyError):
+            pass
+
+        slot_odds, plays = estimate_slot_odds(self.board, self.samples, FORECAST['power_min'], FORECAST['power_max'])
+        try:
+            with open(self.cache_path, 'w') as f:
+                json.dump({'key': key, 'plays': plays, 'slot_odds': slot_odds}, f)
+        except OSError:
+            pass
+        self.odds_plays = plays
+        self.slot_odds = slot_odds
+
+    def prize_odds(self):
+        odds = {}
+        for slot, p in zip(self.board.reward_slots, self.slot_odds):
+            odds[slot[0]] = odds.get(slot[0], 0.0) + p
+        return odds
+
+    def forecast(self, stock):
+        """Forecast per prize in stock, or None while slot odds are still being simulated"""
+        if not self.ready:
+            return None
+        confidence = FORECAST['confidence']
+        tail = (1 - confidence) / 2
+        z = NormalDist().inv_cdf(1 - tail)
+
+        forecasts = {}
+        for prize, odds in self.prize_odds().items():
+            count = stock.get(prize, 0)
+            # Sampling error of the simulated odds, normal approximation
+            error = z * math.sqrt(odds * (1 - odds) / max(self.odds_plays, 1))
+            expected = count / odds if odds > 0 else math.inf
+            low = plays_quantile(count, min(1.0, odds + error), tail)
+            high = plays_quantile(count, max(0.0, odds - error), 1 - tail)
+            forecasts[prize] = Forecast(prize, count, odds, expected, low, high)
+        return forecasts
+
+    def warnings(self, forecasts):
+        if not forecasts:
+            return []
+        lines = []
+        for f in sorted(forecasts.values(), key=lambda f: f.low):
+            if f.stock == 0:
+                lines.append(f"{f.prize} is out of stock")
+            elif f.low < FORECAST['warn_plays']:
+                lines.append(f"{f.prize} may run out in {f.low}-{f.high} plays (~{f.expected:.0f})")
+        return lines
+
+
+def main():
+    from .prizemanager import PrizeManager
+
+    parser = argparse.ArgumentParser(description="Forecast plays until each prize runs out")
+    parser.add_argument('--board', default=None)
+    parser.add_argument('--db', default=os.path.join('db','prizes.db'))
+    args = parser.parse_args()
+
+    forecaster = StockoutForecaster(load_board(args.board))
+    started = time.perf_counter()
+    forecaster.load_odds()
+    odds_s = time.perf_counter() - started
+
+    stock = PrizeManager(args.db).prizes
+    started = time.perf_counter()
+    forecasts = forecaster.forecast(stock)
+    forecast_ms = (time.perf_counter() - started) * 1000
+
+    print(f"slot odds from {forecaster.odds_plays} simulated plays ({odds_s:.2f}s); forecast {forecast_ms:.2f} ms")
+    print(f"{'prize':>12} {'stock':>6} {'odds':>7} {'expected':>9}  {FORECAST['confidence']:.0%} band")
+    for f in sorted(forecasts.values(), key=lambda f: f.expected):
+        print(f"{f.prize:>12} {f.stock:>6} {f.odds:>7.2%} {f.expected:>9.0f}  {f.low}-{f.high}")
+    for line in forecaster.warnings(forecasts):
+        print(f"WARNING: {line}")
+
+
+if __name__ == "__main__":
+    main()
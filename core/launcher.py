@@ -28,6 +28,8 @@ class PinballLauncher:
         self.width = 30
         self.height = 120
         self.ball_rng = ball_rng
+        # Ramp polylines only depend on position; cache one per segment count
+        self.ramp_cache = {}
         
     def update(self, charging):
         self.charging = charging
@@ -59,7 +61,32 @@ class PinballLauncher:
         self.power = 0.0  
         return ball, launched_power
 
-    def draw(self, screen):
+    def ramp_points(self, segments):
+        points = self.ramp_cache.get(segments)
+        if points is None:
+            straight_end_x = self.x
+            straight_end_y = self.y - 60 - 150
+
+            # curve to top-middle peg (inverted U using quadratic Bezier)
+            end_x = SCREEN_WIDTH // 2
+            end_y = 100
+            control_x = (straight_end_x + end_x) / 2
+            control_y = straight_end_y - 90  # peak height of U
+
+            points = []
+            for i in range(segments + 1):
+                t = i / segments
+                rx = (1 - t)**2 * straight_end_x + 2 * (1 - t) * t * control_x + t**2 * end_x
+                ry = (1 - t)**2 * straight_end_y + 2 * (1 - t) * t * control_y + t**2 * end_y
+                points.append((int(rx), int(ry)))
+            self.ramp_cache[segments] = points
+        return points
+
+    def draw(self, screen, power=None, charging=None, quality=None):
+        # power/charging can come from a physics snapshot instead of live state
+        power = self.power if power is None else power
+        charging = self.charging if charging is None else charging
+
         # Draw outer tube body
         pygame.draw.rect(screen, COLORS['GRAY'], (self.x - 15, self.y - 60, 30, 120))
         pygame.draw.rect(screen, COLORS['WHITE'], (self.x - 15, self.y - 60, 30, 120), 3)
@@ -67,9 +94,9 @@ class PinballLauncher:
         pygame.draw.rect(screen, COLORS['BLACK'], (self.x - 10, self.y - 55, 20, 110))
 
         # power indicator
-        if self.charging:
-            power_height = int((self.power / self.max_power) * 100)
-            color = COLORS['GREEN'] if self.power < self.max_power * 0.7 else COLORS['YELLOW'] if self.power < self.max_power * 0.9 else COLORS['RED']
+        if charging:
+            power_height = int((power / self.max_power) * 100)
+            color = COLORS['GREEN'] if power < self.max_power * 0.7 else COLORS['YELLOW'] if power < self.max_power * 0.9 else COLORS['RED']
             pygame.draw.rect(screen, color, (self.x - 8, self.y + 50 - power_height, 16, power_height))
 
         # --- NEW TUBE PATH ---
@@ -79,42 +106,36 @@ class PinballLauncher:
         straight_end_x = start_x
         straight_end_y = start_y - straight_height
 
+        segments = quality.ramp_segments if quality is not None else 19
+        rails = quality.ramp_rails if quality is not None else True
+
         # draw straight vertical section
-        pygame.draw.line(screen, COLORS['WHITE'], (start_x - 5, start_y), (straight_end_x - 5, straight_end_y), 3)
-        pygame.draw.line(screen, COLORS['WHITE'], (start_x + 5, start_y), (straight_end_x + 5, straight_end_y), 3)
+        if rails:
+            pygame.draw.line(screen, COLORS['WHITE'], (start_x - 5, start_y), (straight_end_x - 5, straight_end_y), 3)
+            pygame.draw.line(screen, COLORS['WHITE'], (start_x + 5, start_y), (straight_end_x + 5, straight_end_y), 3)
         pygame.draw.line(screen, COLORS['SILVER'], (start_x, start_y), (straight_end_x, straight_end_y), 2)
 
-        # curve to top-middle peg (inverted U using quadratic Bezier)
-        end_x = SCREEN_WIDTH // 2
-        end_y = 100
-        control_x = (straight_end_x + end_x) / 2
-        control_y = straight_end_y - 90  # peak height of U
-
-        ramp_points = []
-        for i in range(20):
-            t = i / 19.0
-            rx = (1 - t)**2 * straight_end_x + 2 * (1 - t) * t * control_x + t**2 * end_x
-            ry = (1 - t)**2 * straight_end_y + 2 * (1 - t) * t * control_y + t**2 * end_y
-            ramp_points.append((int(rx), int(ry)))
-
-        for i in range(len(ramp_points) - 1):
-            pygame.draw.line(screen, COLORS['WHITE'],
-                            (ramp_points[i][0] - 5, ramp_points[i][1] - 4),
-                            (ramp_points[i+1][0] - 5, ramp_points[i+1][1] - 5), 3)
-            pygame.draw.line(screen, COLORS['WHITE'],
-                            (ramp_points[i][0] + 5, ramp_points[i][1] + 5),
-                            (ramp_points[i+1][0] + 5, ramp_points[i+1][1] + 5), 3)
-            pygame.draw.line(screen, COLORS['SILVER'], ramp_points[i], ramp_points[i+1], 2)
+        # curve to top-middle peg
+        ramp_points = self.ramp_points(segments)
+        if rails:
+            for i in range(len(ramp_points) - 1):
+                pygame.draw.line(screen, COLORS['WHITE'],
+                                (ramp_points[i][0] - 5, ramp_points[i][1] - 4),
+                                (ramp_points[i+1][0] - 5, ramp_points[i+1][1] - 5), 3)
+                pygame.draw.line(screen, COLORS['WHITE'],
+                                (ramp_points[i][0] + 5, ramp_points[i][1] + 5),
+                                (ramp_points[i+1][0] + 5, ramp_points[i+1][1] + 5), 3)
+        pygame.draw.lines(screen, COLORS['SILVER'], False, ramp_points, 2)
 
 
-    def launch(self):
+    def launch(self, rng=None):
         if self.power <= 0:
             return None, 0
 
         velocity_magnitude = (self.power / self.max_power) * 10  # max speed scale
         vx = 0.0
         vy = -velocity_magnitude
-        ball = Ball(self.x, self.y - 30, vx, vy, follow_ramp=True)
+        ball = Ball(self.x, self.y - 30, vx, vy, follow_ramp=True, rng=rng if rng is not None else self.ball_rng)
         ball.launch_speed = self.power / self.max_power
         ball.vy = -velocity_magnitude  # upward climb in tube
 
@@ -0,0 +1,69 @@
+import asyncio
+import argparse
+import random
+import time
+from collections import Counter
+
+from . import protocol
+
+# Local load generator for core.server: opens many concurrent kiosk sessions
+# and fires launches at random power, then reports throughput and latency.
+#
+#   python -m core.server --db /tmp/prizes_copy.db &
+#   python -m core.loadgen --sessions 300 --plays 10
+
+
+async def session(host, port, plays, stride, rng, latencies, outcomes):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(plays):
+            power = rng.uniform(5.0, 20.0)
+            started = time.perf_counter()
+            writer.write(protocol.LAUNCH.pack(stride, power))
+            await writer.drain()
+            while True:
+                kind, payload = await protocol.read_message(reader)
+                if kind == 'outcome':
+                    break
+            latencies.append(time.perf_counter() - started)
+            outcomes[payload['name'] or "Failed launch"] += 1
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run_load(host, port, sessions, plays, stride, seed):
+    rng = random.Random(seed)
+    latencies = []
+    outcomes = Counter()
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        session(host, port, plays, stride, random.Random(rng.random()), latencies, outcomes)
+        for _ in range(sessions)
+    ))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    print(f"{len(latencies)} plays over {sessions} sessions in {elapsed:.2f}s ({len(latencies) / elapsed:.0f} plays/s)")
+    print(f"latency ms: p50 {pct(0.50):.1f}  p95 {pct(0.95):.1f}  p99 {pct(0.99):.1f}  max {latencies[-1] * 1000:.1f}")
+    for name, count in outcomes.most_common():
+        print(f"  {name}: {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the headless Plinko server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--plays', type=int, default=5)
+    parser.add_argument('--stride', type=int, default=1, help="frame stride to request, 0 for outcome only")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run_load(args.host, args.port, args.sessions, args.plays, args.stride, args.seed))
+
+
+if __name__ == "__main__":
+    main()
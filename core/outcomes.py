@@ -0,0 +1,209 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import random
+import struct
+import time
+import tomllib
+from collections import namedtuple
+from multiprocessing import Pool
+
+from .ball import PHYSICS_VERSION
+from .board import load_board
+from .launcher import PinballLauncher
+from .simulation import simulate_play
+
+# Precomputed outcome table: the result of every (play, quantised power)
+# pair for one seed and board, so a play can be resolved without simulating.
+#
+#   python -m core.outcomes --seed 42 --plays 500
+#
+#   HEADER  magic, version, seed, board digest, power step, power levels, plays
+#   RECORD  per play, per power level: slot code, steps until it resolved
+#
+# Record (play, level) sits at HEADER.size + ((play - 1) * levels + level) * RECORD.size,
+# so a lookup is one unpack from the memory-mapped file.
+
+with open(os.path.join("core",'gameconfig.toml'), 'rb') as conf:
+    GAME_CONFIGS = tomllib.load(conf)
+    OUTCOMES = GAME_CONFIGS['outcomes']
+
+MAGIC = b'PLOT'
+VERSION = 1
+HEADER = struct.Struct('<4sBq20sdHI')
+RECORD = struct.Struct('<BH')
+
+# Slot codes besides slot indices
+LOST_CODE = 253
+OFF_SLOT_CODE = 254
+FAILED_CODE = 255
+
+MAX_POWER = PinballLauncher(0, 0).max_power
+
+Outcome = namedtuple('Outcome', ['status', 'slot', 'steps'])
+
+
+def board_digest(board):
+    key = json.dumps([PHYSICS_VERSION, board.config, board.reward_slots], sort_keys=True, default=str)
+    return hashlib.sha1(key.encode('utf-8')).digest()
+
+
+def power_levels(power_step):
+    return round(MAX_POWER / power_step) + 1
+
+
+def level_power(level, power_step):
+    return min(MAX_POWER, level * power_step)
+
+
+def quantise(power, power_step):
+    """Nearest power on the table grid; launching with it reproduces the table exactly"""
+    return level_power(round(power / power_step), power_step)
+
+
+def _outcome_code(result):
+    if result['status'] == 'failed':
+        return FAILED_CODE
+    if result['status'] != 'landed':
+        return LOST_CODE
+    if result['slot'] is None:
+        return OFF_SLOT_CODE
+    return result['slot']
+
+
+_worker_board = None
+
+
+def _init_worker(board_path):
+    global _worker_board
+    _worker_board = load_board(board_path)
+
+
+def _build_play(args):
+    seed, play, power_step, levels = args
+    out = bytearray()
+    for level in range(levels):
+        result = simulate_play(seed, play, level_power(level, power_step), _worker_board)
+        out += RECORD.pack(_outcome_code(result), result['steps'])
+    return bytes(out)
+
+
+def build_table(path, seed, plays, power_step=OUTCOMES['power_step'], board_path=None, processes=None):
+    board = load_board(board_path)
+    levels = power_levels(power_step)
+    jobs = [(seed, play, power_step, levels) for play in range(1, plays + 1)]
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, seed, board_digest(board), power_step, levels, plays))
+        with Pool(processes, initializer=_init_worker, initargs=(board_path,)) as pool:
+            for records in pool.imap(_build_play, jobs, chunksize=4):
+                f.write(records)
+    os.replace(tmp_path, path)
+
+
+class OutcomeTable:
+    """Memory-mapped outcome table; lookups read one record straight from the map"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, self.seed, self.digest, self.power_step,
+             self.levels, self.plays) = HEADER.unpack_from(self.map)
+        except struct.error:
+            self.map.close()
+            raise ValueError(f"{path} is not an outcome table")
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            raise ValueError(f"{path} is not an outcome table")
+        if len(self.map) != HEADER.size + self.plays * self.levels * RECORD.size:
+            self.map.close()
+            raise ValueError(f"{path} is truncated")
+        # Identifies the table's plays in the prize database
+        self.key = f"{self.seed}:{self.digest.hex()}"
+
+    def matches(self, seed, board):
+        return seed == self.seed and board_digest(board) == self.digest
+
+    def covers(self, play):
+        return 1 <= play <= self.plays
+
+    def quantise(self, power):
+        return quantise(power, self.power_step)
+
+    def lookup(self, play, power):
+        """Outcome of play at the grid power nearest to power, or None past the table"""
+        if not self.covers(play):
+            return None
+        level = min(self.levels - 1, max(0, round(power / self.power_step)))
+        code, steps = RECORD.unpack_from(self.map, HEADER.size + ((play - 1) * self.levels + level) * RECORD.size)
+        if code == FAILED_CODE:
+            return Outcome('failed', None, steps)
+        if code == LOST_CODE:
+            return Outcome('lost', None, steps)
+        if code == OFF_SLOT_CODE:
+            return Outcome('landed', None, steps)
+        return Outcome('landed', code, steps)
+
+    def close(self):
+        self.map.close()
+
+
+def load_table(path, seed, board):
+    """Table at path if it was built for this seed and board, else None"""
+    try:
+        table = OutcomeTable(path)
+    except (OSError, ValueError):
+        return None
+    if not table.matches(seed, board):
+        table.close()
+        return None
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the outcome of every play and launch power")
+    parser.add_argument('--seed', type=int, required=True)
+    parser.add_argument('--plays', type=int, default=OUTCOMES['plays'])
+    parser.add_argument('--power-step', type=float, default=OUTCOMES['power_step'])
+    parser.add_argument('--out', default=OUTCOMES['path'])
+    parser.add_argument('--board', default=None, help="board TOML the table is built for")
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--check', type=int, default=200, metavar='N',
+                        help="re-simulate N random entries against the table and time lookups")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    build_table(args.out, args.seed, args.plays, args.power_step, args.board, args.processes)
+    table = OutcomeTable(args.out)
+    print(f"{args.out}: {table.plays} plays x {table.levels} power levels, "
+          f"{len(table.map) / 1024:.0f} KiB, built in {time.perf_counter() - started:.1f}s")
+
+    if args.check:
+        board = load_board(args.board)
+        rng = random.Random(args.seed)
+        probes = [(rng.randint(1, table.plays), level_power(rng.randrange(table.levels), table.power_step))
+                  for _ in range(args.check)]
+        started = time.perf_counter()
+        for play, power in probes:
+            table.lookup(play, power)
+        lookup_us = (time.perf_counter() - started) / len(probes) * 1e6
+
+        started = time.perf_counter()
+        mismatches = 0
+        for play, power in probes:
+            result = simulate_play(args.seed, play, power, board)
+            outcome = table.lookup(play, power)
+            if (outcome.slot, outcome.steps) != (result['slot'], result['steps']):
+                mismatches += 1
+        simulate_us = (time.perf_counter() - started) / len(probes) * 1e6
+        print(f"lookup {lookup_us:.1f} us vs simulate {simulate_us:.0f} us per play; "
+              f"{len(probes) - mismatches}/{len(probes)} entries match a fresh simulation")
+    table.close()
+
+
+if __name__ == "__main__":
+    main()
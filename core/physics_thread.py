@@ -0,0 +1,93 @@
+import pygame
+import threading
+from collections import deque, namedtuple
+import tomllib, os
+
+with open(os.path.join("core",'gameconfig.toml'), 'rb') as conf:
+    GAME_CONFIGS = tomllib.load(conf)
+    VIEW = GAME_CONFIGS['view_parameters']
+
+
+FPS = VIEW['FPS']
+
+# Everything the renderer needs from the simulation for one frame. Balls are
+# stored as plain (x, y, color, radius, active) tuples so the snapshot never
+# shares mutable objects with the physics thread.
+GameSnapshot = namedtuple('GameSnapshot', [
+    'tick', 'state', 'balls', 'launcher_power', 'launcher_charging', 'last_reward',
+    'server_error',
+])
+
+
+class SnapshotBuffer:
+    """Two-slot snapshot buffer.
+
+    The writer fills the back slot and then flips the front index; the reader
+    only ever looks at the front slot. Both the slot write and the index flip
+    are single reference assignments, so neither side needs a lock.
+    """
+
+    def __init__(self, initial):
+        self.slots = [initial, initial]
+        self.front = 0
+
+    def publish(self, snapshot):
+        back = 1 - self.front
+        self.slots[back] = snapshot
+        self.front = back
+
+    def latest(self):
+        return self.slots[self.front]
+
+
+class PhysicsThread:
+    """Runs PlinkoGame.handle_events/update at a fixed FPS off the render thread.
+
+    The render thread forwards gameplay events through `post` (a deque, whose
+    append/popleft are atomic) and draws whatever `latest` returns. Seeded
+    outcomes stay deterministic because the ball RNG is only ever touched
+    here, one fixed tick at a time, exactly as in the single-threaded loop.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.inbox = deque()
+        self.buffer = SnapshotBuffer(game.snapshot())
+        self.running = False
+        # Whatever ended the loop early; the render thread re-raises it in check()
+        self.error = None
+        self.thread = threading.Thread(target=self.loop, name="plinko-physics", daemon=True)
+
+    def start(self):
+        self.running = True
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread.is_alive():
+            self.thread.join(timeout=1.0)
+
+    def post(self, events):
+        if events:
+            self.inbox.append(events)
+
+    def latest(self):
+        return self.buffer.latest()
+
+    def check(self):
+        """Raise on the calling thread if the physics loop died"""
+        if self.error is not None:
+            raise RuntimeError("Physics thread stopped") from self.error
+
+    def loop(self):
+        clock = pygame.time.Clock()
+        try:
+            while self.running:
+                while self.inbox:
+                    self.game.handle_events(self.inbox.popleft())
+                self.game.update()
+                self.buffer.publish(self.game.snapshot())
+                clock.tick(FPS)
+        except Exception as error:
+            self.error = error
+            self.running = False
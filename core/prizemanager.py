@@ -1,5 +1,12 @@
 import sqlite3
 import os
+import secrets
+
+
+def new_session():
+    # Random id of one game or server run; awards are keyed by (session, play)
+    return secrets.randbits(63)
+
 
 class PrizeManager:
     def __init__(self, db_path=os.path.join('db','prizes.db'), initial_prizes=None):
@@ -8,6 +15,7 @@ class PrizeManager:
         
 
         # Load existing prizes from database
+        self.init_db()
         self.load_prizes()
 
     def init_db(self):
@@ -17,6 +25,23 @@ class PrizeManager:
                 CREATE TABLE IF NOT EXISTS prizes
                 (name TEXT PRIMARY KEY, count INTEGER)
             ''')
+            # One row per awarded play so an award survives a crash exactly once.
+            # Play numbers restart every run, so rows are keyed by session, not
+            # by seed; rows of the old (seed, play) layout cannot be told apart.
+            cursor.execute('PRAGMA table_info(awards)')
+            columns = [row[1] for row in cursor.fetchall()]
+            if columns and 'session' not in columns:
+                cursor.execute('DROP TABLE awards')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS awards
+                (session INTEGER, play INTEGER, name TEXT, PRIMARY KEY (session, play))
+            ''')
+
+            # Next unused play of each outcome table, so no table row is ever dealt twice
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS table_plays
+                (table_key TEXT PRIMARY KEY, next_play INTEGER)
+            ''')
 
             conn.commit()
 
@@ -39,6 +64,18 @@ class PrizeManager:
                 ''', (quantity, name))
             conn.commit()
 
+    def update_prizes(self, counts):
+        # Several edited counts in one transaction
+        if not counts:
+            return
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                UPDATE prizes SET count = ? WHERE name = ?
+            ''', [(quantity, name) for name, quantity in counts.items()])
+            conn.commit()
+        self.prizes.update(counts)
+
     def get_prize_count(self, prize_name):
         return self.prizes.get(prize_name, 0)
 
@@ -49,5 +86,53 @@ class PrizeManager:
             return True
         return False
 
+    def award_prize(self, prize_name, session, play):
+        """Decrement stock for play (session, play) at most once.
+
+        The decrement and the award record commit together, so a play that is
+        re-simulated after a crash (resumed with the same session) finds its
+        earlier award instead of taking a second prize. Returns True if the
+        play holds prize_name.
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT name FROM awards WHERE session = ? AND play = ?', (session, play))
+            row = cursor.fetchone()
+            if row is not None:
+                return row[0] == prize_name
+            if self.prizes.get(prize_name, 0) <= 0:
+                return False
+            self.prizes[prize_name] -= 1
+            cursor.execute('''
+                UPDATE prizes SET count = ? WHERE name = ?
+            ''', (self.prizes[prize_name], prize_name))
+            cursor.execute('''
+                INSERT INTO awards (session, play, name) VALUES (?, ?, ?)
+            ''', (session, play, prize_name))
+            conn.commit()
+        return True
+
+    def next_table_play(self, table_key):
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT next_play FROM table_plays WHERE table_key = ?', (table_key,))
+            row = cursor.fetchone()
+        return row[0] if row is not None else 1
+
+    def claim_table_play(self, table_key):
+        # Reserve the next unused play of an outcome table; committed before it is launched
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR IGNORE INTO table_plays (table_key, next_play) VALUES (?, 1)
+            ''', (table_key,))
+            cursor.execute('SELECT next_play FROM table_plays WHERE table_key = ?', (table_key,))
+            play = cursor.fetchone()[0]
+            cursor.execute('''
+                UPDATE table_plays SET next_play = ? WHERE table_key = ?
+            ''', (play + 1, table_key))
+            conn.commit()
+        return play
+
     def close(self):
         self.save_prizes()
\ No newline at end of file
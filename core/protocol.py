@@ -0,0 +1,83 @@
+import struct
+
+# Wire format between the headless server and kiosk clients.
+#
+# client -> server, one per launch:
+#   LAUNCH     stride (uint8, 0 = outcome only), power (float32)
+# server -> client, zero or more FRAMES then exactly one OUTCOME:
+#   b'F' + FRAMES_HEADER count (uint16) + count * FRAME (int16 x, int16 y)
+#   b'O' + OUTCOME play (uint32), slot (uint8, NO_SLOT if none),
+#          awarded (uint8), steps (uint16), name length (uint16) + utf-8 name
+
+LAUNCH = struct.Struct('<Bf')
+FRAMES_HEADER = struct.Struct('<H')
+FRAME = struct.Struct('<hh')
+OUTCOME = struct.Struct('<IBBHH')
+
+FRAMES_TAG = b'F'
+OUTCOME_TAG = b'O'
+NO_SLOT = 255
+MAX_FRAMES_PER_MESSAGE = 64
+
+
+def pack_frames(points):
+    out = bytearray(FRAMES_TAG)
+    out += FRAMES_HEADER.pack(len(points))
+    for x, y in points:
+        out += FRAME.pack(int(x), int(y))
+    return bytes(out)
+
+
+def unpack_frames(payload):
+    return [FRAME.unpack_from(payload, i * FRAME.size) for i in range(len(payload) // FRAME.size)]
+
+
+def pack_outcome(play, slot, awarded, steps, name):
+    name_bytes = name.encode('utf-8')
+    slot = NO_SLOT if slot is None else slot
+    return OUTCOME_TAG + OUTCOME.pack(play, slot, int(awarded), min(steps, 0xFFFF), len(name_bytes)) + name_bytes
+
+
+def parse_message():
+    """Parser for one server message, shared by the async and blocking readers.
+
+    It yields how many bytes it needs next and is sent exactly that many;
+    it returns ('frames', points) or ('outcome', dict).
+    """
+    tag = yield 1
+    if tag == FRAMES_TAG:
+        count, = FRAMES_HEADER.unpack((yield FRAMES_HEADER.size))
+        return 'frames', unpack_frames((yield count * FRAME.size))
+    if tag == OUTCOME_TAG:
+        play, slot, awarded, steps, name_len = OUTCOME.unpack((yield OUTCOME.size))
+        name = (yield name_len).decode('utf-8')
+        return 'outcome', {
+            'play': play,
+            'slot': None if slot == NO_SLOT else slot,
+            'awarded': bool(awarded),
+            'steps': steps,
+            'name': name,
+        }
+    raise ValueError(f"Unknown message tag {tag!r}")
+
+
+async def read_message(reader):
+    """Read one server message from an asyncio StreamReader"""
+    parser = parse_message()
+    size = next(parser)
+    try:
+        while True:
+            size = parser.send(await reader.readexactly(size))
+    except StopIteration as done:
+        return done.value
+
+
+def read_message_from(readexactly):
+    """Blocking counterpart of read_message; readexactly(n) returns n bytes or raises"""
+    parser = parse_message()
+    size = next(parser)
+    try:
+        while True:
+            size = parser.send(readexactly(size))
+    except StopIteration as done:
+        return done.value
@@ -0,0 +1,80 @@
+from collections import deque, namedtuple
+import tomllib, os
+
+with open(os.path.join("core",'gameconfig.toml'), 'rb') as conf:
+    GAME_CONFIGS = tomllib.load(conf)
+    VIEW = GAME_CONFIGS['view_parameters']
+    QUALITY = GAME_CONFIGS['render_quality']
+
+
+FPS = VIEW['FPS']
+
+RenderQuality = namedtuple('RenderQuality', [
+    'name', 'layered_pegs', 'ramp_segments', 'ramp_rails', 'highlights', 'splash_dots',
+])
+
+# Lowest to highest. Each step down drops the detail that costs the most
+# draw calls for the least visible difference.
+QUALITY_LEVELS = (
+    RenderQuality('low', layered_pegs=False, ramp_segments=6, ramp_rails=False, highlights=False, splash_dots=False),
+    RenderQuality('medium', layered_pegs=False, ramp_segments=10, ramp_rails=True, highlights=False, splash_dots=True),
+    RenderQuality('high', layered_pegs=True, ramp_segments=19, ramp_rails=True, highlights=True, splash_dots=True),
+)
+QUALITY_NAMES = tuple(q.name for q in QUALITY_LEVELS)
+
+
+class QualityGovernor:
+    """Adapts render quality to the rolling frame time.
+
+    Quality drops a level as soon as the rolling mean exceeds the downgrade
+    threshold, but only rises again after a long calm streak well under
+    budget. The gap between the two thresholds, the calm streak and the
+    cooldown after every change keep it from oscillating between levels.
+    """
+
+    def __init__(self, fps=FPS, fixed=None):
+        self.budget = 1.0 / fps
+        self.frames = deque(maxlen=QUALITY['window'])
+        self.total = 0.0
+        self.level = len(QUALITY_LEVELS) - 1 if fixed is None else QUALITY_NAMES.index(fixed)
+        self.fixed = fixed is not None
+        self.cooldown = 0
+        self.calm = 0
+
+    @property
+    def quality(self):
+        return QUALITY_LEVELS[self.level]
+
+    def record(self, frame_time):
+        if self.fixed:
+            return
+        if len(self.frames) == self.frames.maxlen:
+            self.total -= self.frames[0]
+        self.frames.append(frame_time)
+        self.total += frame_time
+
+        if self.cooldown:
+            self.cooldown -= 1
+            return
+        if len(self.frames) < self.frames.maxlen:
+            return
+
+        mean = self.total / len(self.frames)
+        if mean > self.budget * QUALITY['downgrade_ratio']:
+            self.calm = 0
+            if self.level > 0:
+                self.set_level(self.level - 1)
+        elif mean < self.budget * QUALITY['upgrade_ratio']:
+            self.calm += 1
+            if self.calm >= QUALITY['upgrade_frames'] and self.level < len(QUALITY_LEVELS) - 1:
+                self.set_level(self.level + 1)
+        else:
+            self.calm = 0
+
+    def set_level(self, level):
+        self.level = level
+        self.frames.clear()
+        self.total = 0.0
+        self.calm = 0
+        self.cooldown = QUALITY['cooldown_frames']
+        print(f"Render quality: {self.quality.name}")
@@ -0,0 +1,267 @@
+import os
+import struct
+import threading
+import time
+
+import pygame
+
+from .ball import Ball
+from .board import NO_PRIZE
+from .protocol import FRAME, NO_SLOT
+from .remote import ReplayBall
+from .rng import play_rng
+
+# Compact binary crash-recovery snapshot of a PlinkoGame.
+#
+#   HEADER   magic, version, seed, session, plays, ticks, state, mouse_pressed,
+#            launched_once, launcher power, ms since the result screen opened,
+#            last reward, outcome count, recent outcome count, ball count,
+#            replay count
+#   OUTCOME  one byte per recent outcome (slot index, or NO_PRIZE_CODE): only
+#            the last RECENT_OUTCOMES, so a snapshot stays the same size
+#            however long the kiosk runs
+#   BALL     full physics state of each in-flight ball, incl. its RNG position
+#   REPLAY   each thin-client ball whose outcome has arrived: the server's
+#            outcome, frame index, launch speed, power, color, then the
+#            prize name and every FRAME received
+#
+# Stock is not stored here: awards are committed to the prize database
+# together with their (session, play) in PrizeManager.award_prize. The
+# session id is stored here and reused only on resume, so a ball
+# re-simulated after a restore can neither take a second prize nor lose one.
+# In thin-client mode the server commits the award as soon as it has
+# simulated the play, seconds before the kiosk's replay lands, so the replay
+# itself is kept and finished after a restore.
+
+MAGIC = b'PLNK'
+VERSION = 4
+HEADER = struct.Struct('<4sBqqIIBBBdIBIHBB')
+OUTCOME = struct.Struct('<B')
+BALL = struct.Struct('<10d??IQ3B')
+REPLAY = struct.Struct('<IB?HiIdd3BH')
+
+STATES = ("splash", "playing", "result")
+NO_REWARD_CODE = 254
+NO_PRIZE_CODE = 255
+NO_CURVE = -1.0
+
+# How often to snapshot when nothing noteworthy happens
+DEFAULT_INTERVAL = 0.25
+# Outcomes listed in a snapshot; older ones are only counted
+RECENT_OUTCOMES = 100
+
+
+def _reward_code(reward, reward_slots):
+    if reward is None:
+        return NO_REWARD_CODE
+    if reward in reward_slots:
+        return reward_slots.index(reward)
+    return NO_PRIZE_CODE
+
+
+def _reward_from_code(code, reward_slots):
+    if code == NO_REWARD_CODE:
+        return None
+    if code == NO_PRIZE_CODE:
+        return NO_PRIZE
+    return reward_slots[code]
+
+
+def pack_state(game):
+    balls = [ball for ball in game.balls if isinstance(ball, Ball)]
+    # A replay still waiting for its outcome has nothing to restore: the
+    # server has not finished simulating it, so it has not awarded it either
+    replays = [ball for ball in game.balls if isinstance(ball, ReplayBall) and ball.outcome is not None]
+    recent = game.recorded_outcomes[-RECENT_OUTCOMES:]
+    result_elapsed = 0
+    if game.state == "result" and game.result_timer:
+        result_elapsed = max(0, pygame.time.get_ticks() - game.result_timer)
+
+    out = bytearray(HEADER.pack(
+        MAGIC, VERSION, game.seed, game.session, game.plays, game.ticks,
+        STATES.index(game.state), game.mouse_pressed, game.launched_once,
+        game.launcher.power, result_elapsed,
+        _reward_code(game.last_reward, game.reward_slots),
+        game.outcome_count, len(recent), len(balls), len(replays),
+    ))
+    for reward in recent:
+        out += OUTCOME.pack(_reward_code(reward, game.reward_slots))
+    for ball in balls:
+        out += BALL.pack(
+            ball.x, ball.y, ball.vx, ball.vy,
+            ball.launch_speed, ball.start_ramp_x, ball.start_ramp_y,
+            getattr(ball, 'curve_t', NO_CURVE), ball.ramp_t, ball.power,
+            ball.follow_ramp, ball.active, ball.play, ball.rng.counter,
+            *ball.color,
+        )
+    for ball in replays:
+        outcome = ball.outcome
+        name = outcome['name'].encode('utf-8')
+        out += REPLAY.pack(
+            outcome['play'], NO_SLOT if outcome['slot'] is None else outcome['slot'],
+            outcome['awarded'], outcome['steps'], ball.index, len(ball.frames),
+            ball.launch_speed, ball.power, *ball.color, len(name),
+        )
+        out += name
+        for frame in ball.frames:
+            out += FRAME.pack(*frame)
+    return bytes(out)
+
+
+def snapshot_seed(data):
+    magic, version, seed = HEADER.unpack_from(data)[:3]
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a Plinko recovery snapshot")
+    return seed
+
+
+def restore_state(game, data):
+    (magic, version, seed, session, plays, ticks, state, mouse_pressed, launched_once,
+     power, result_elapsed, last_reward, outcome_count, recent_count, ball_count,
+     replay_count) = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a Plinko recovery snapshot")
+
+    game.seed = seed
+    game.session = session
+    game.plays = plays
+    game.ticks = ticks
+    game.state = STATES[state]
+    game.mouse_pressed = mouse_pressed
+    game.launched_once = launched_once
+    game.launcher.power = power
+    game.last_reward = _reward_from_code(last_reward, game.reward_slots)
+    game.result_timer = pygame.time.get_ticks() - result_elapsed if game.state == "result" else 0
+
+    offset = HEADER.size
+    game.outcome_count = outcome_count
+    game.recorded_outcomes = []
+    for _ in range(recent_count):
+        code, = OUTCOME.unpack_from(data, offset)
+        game.recorded_outcomes.append(_reward_from_code(code, game.reward_slots))
+        offset += OUTCOME.size
+
+    game.balls = []
+    for _ in range(ball_count):
+        (x, y, vx, vy, launch_speed, start_ramp_x, start_ramp_y, curve_t, ramp_t, ball_power,
+         follow_ramp, active, play, counter, r, g, b) = BALL.unpack_from(data, offset)
+        offset += BALL.size
+
+        ball = Ball(x, y, vx, vy, follow_ramp=follow_ramp, rng=play_rng(seed, play))
+        ball.rng.counter = counter
+        ball.radius = game.board.ball_radius
+        ball.color = (r, g, b)
+        ball.active = active
+        ball.launch_speed = launch_speed
+        ball.start_ramp_x = start_ramp_x
+        ball.start_ramp_y = start_ramp_y
+        ball.ramp_t = ramp_t
+        if curve_t != NO_CURVE:
+            ball.curve_t = curve_t
+        ball.play = play
+        ball.power = ball_power
+        game.balls.append(ball)
+
+    for _ in range(replay_count):
+        (play, slot, awarded, steps, index, frame_count, launch_speed, ball_power,
+         r, g, b, name_len) = REPLAY.unpack_from(data, offset)
+        offset += REPLAY.size
+        name = data[offset:offset + name_len].decode('utf-8')
+        offset += name_len
+        frames = [FRAME.unpack_from(data, offset + i * FRAME.size) for i in range(frame_count)]
+        offset += frame_count * FRAME.size
+
+        ball = ReplayBall(frames, {
+            'play': play,
+            'slot': None if slot == NO_SLOT else slot,
+            'awarded': awarded,
+            'steps': steps,
+            'name': name,
+        })
+        ball.color = (r, g, b)
+        ball.index = index
+        if index >= 0:
+            ball.x, ball.y = frames[index]
+        ball.launch_speed = launch_speed
+        ball.play = play
+        ball.power = ball_power
+        game.balls.append(ball)
+
+
+def load_snapshot(path):
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        snapshot_seed(data)
+        return data
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+class SnapshotWriter:
+    """Writes recovery snapshots atomically on a background thread.
+
+    The game thread only packs a few hundred bytes and hands them over; the
+    writer keeps just the newest pending snapshot and writes it to a temp
+    file, fsyncs and renames it over the previous one, so a crash at any
+    point leaves either the old or the new snapshot, never a torn one.
+    """
+
+    def __init__(self, path, interval=DEFAULT_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.pending = None
+        self.last_key = None
+        self.last_save = 0.0
+        self.cond = threading.Condition()
+        self.running = True
+        self.thread = threading.Thread(target=self.loop, name="plinko-recovery", daemon=True)
+        self.thread.start()
+
+    def maybe_save(self, game):
+        # Launches, landings, state changes and server outcomes are saved right
+        # away; anything else (ball flight, charging) at most once per interval.
+        decided = sum(1 for ball in game.balls if getattr(ball, 'outcome', None) is not None)
+        key = (game.state, game.plays, game.outcome_count, len(game.balls), decided)
+        now = time.monotonic()
+        if key == self.last_key and now - self.last_save < self.interval:
+            return
+        self.last_key = key
+        self.last_save = now
+        self.submit(pack_state(game))
+
+    def submit(self, data):
+        with self.cond:
+            self.pending = data
+            self.cond.notify()
+
+    def loop(self):
+        while True:
+            with self.cond:
+                while self.pending is None and self.running:
+                    self.cond.wait()
+                data = self.pending
+                self.pending = None
+                if data is None:
+                    return
+            self.write(data)
+
+    def write(self, data):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def close(self, discard=False):
+        """Flush and stop; discard=True removes the snapshot after a clean exit"""
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        self.thread.join()
+        if discard:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,143 @@
+import queue
+import random
+import socket
+import threading
+import tomllib, os
+
+from . import protocol
+from .ball import draw_ball
+
+with open(os.path.join("core",'gameconfig.toml'), 'rb') as conf:
+    GAME_CONFIGS = tomllib.load(conf)
+    VIEW = GAME_CONFIGS['view_parameters']
+    COLORS = GAME_CONFIGS['colormaps']
+
+
+PEG_RADIUS = VIEW['PEG_RADIUS']
+
+
+class ReplayBall:
+    """Ball that plays back a trajectory computed elsewhere.
+
+    Quacks like Ball for PlinkoGame.update/draw_game, but update() just steps
+    through the frames instead of simulating, so the outcome is whatever the
+    source of the frames decided. Frames may still be arriving while it
+    plays; it is finished once the outcome is in and every frame was shown.
+    """
+
+    def __init__(self, frames=None, outcome=None, rng=None):
+        self.frames = frames if frames is not None else []
+        self.outcome = outcome
+        # Set instead of outcome when the source fails mid-play
+        self.error = None
+        self.index = -1
+        self.radius = PEG_RADIUS
+        self.rng = rng if rng is not None else random.Random()
+        self.color = self.rng.choice([COLORS['RED'], COLORS['BLUE'], COLORS['GREEN'],
+                                      COLORS['YELLOW'], COLORS['ORANGE'], COLORS['PURPLE']])
+        self.x, self.y = 0, 0
+        self.active = True
+        self.launch_speed = 1.0
+
+    @property
+    def finished(self):
+        return self.outcome is not None and self.index >= len(self.frames) - 1
+
+    def update(self, pegs):
+        if not self.active:
+            return
+        if self.index < len(self.frames) - 1:
+            self.index += 1
+            self.x, self.y = self.frames[self.index]
+
+    def snapshot(self):
+        # Nothing to draw until the first frame has arrived
+        return (self.x, self.y, self.color, self.radius, self.active and self.index >= 0)
+
+    def draw(self, screen):
+        if not self.active or self.index < 0:
+            return
+        draw_ball(screen, self.x, self.y, self.color, self.radius)
+
+
+class RemoteClient:
+    """Kiosk-side connection to core.server.
+
+    launch() only queues the request and returns a ReplayBall at once. A
+    worker thread owns the socket: it connects when needed, sends each
+    launch and appends frames to the ball as they stream in, so the render
+    loop never waits on the network. If the server cannot be reached or
+    drops mid-play, the ball gets `error` set and the next launch reconnects.
+    """
+
+    def __init__(self, host, port, stride=1, timeout=5.0):
+        self.host = host
+        self.port = port
+        self.stride = stride
+        self.timeout = timeout
+        self.sock = None
+        self.stream = None
+        self.requests = queue.Queue()
+        self.thread = None
+
+    def connect(self):
+        self.sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stream = self.sock.makefile('rb')
+
+    def disconnect(self):
+        sock, stream = self.sock, self.stream
+        self.sock = None
+        self.stream = None
+        try:
+            if stream is not None:
+                stream.close()
+            if sock is not None:
+                sock.close()
+        except OSError:
+            pass
+
+    def readexactly(self, n):
+        data = self.stream.read(n)
+        if len(data) != n:
+            raise ConnectionError("Server closed the connection")
+        return data
+
+    def launch(self, power):
+        """Queue a launch; returns a ReplayBall the server's stream fills in"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.loop, name="plinko-remote", daemon=True)
+            self.thread.start()
+        ball = ReplayBall()
+        self.requests.put((ball, power))
+        return ball
+
+    def loop(self):
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            ball, power = request
+            try:
+                if self.sock is None:
+                    self.connect()
+                self.sock.sendall(protocol.LAUNCH.pack(self.stride, power))
+                while True:
+                    kind, payload = protocol.read_message_from(self.readexactly)
+                    if kind == 'frames':
+                        ball.frames.extend(payload)
+                    else:
+                        ball.outcome = payload
+                        break
+            except (OSError, ValueError) as error:
+                self.disconnect()
+                ball.error = error
+
+    def close(self):
+        if self.thread is not None:
+            self.requests.put(None)
+            # Unblocks a worker still waiting on the server
+            self.disconnect()
+            self.thread.join(timeout=1.0)
+            self.thread = None
+        self.disconnect()
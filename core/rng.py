@@ -0,0 +1,62 @@
+import hashlib
+import random
+import struct
+
+# Stream ids. Play k (1-based, in launch order) uses stream k, so streams for
+# different plays never overlap and any one can be derived on its own.
+SPLASH_STREAM = 0
+
+_BLOCK = struct.Struct('<Q')
+_KEY = struct.Struct('<qq')
+
+
+class CounterRNG(random.Random):
+    """Counter-based random stream keyed by (seed, stream).
+
+    Draw n is blake2b(n) under a key derived from (seed, stream), so the
+    generator for any play can be built in O(1) without replaying earlier
+    plays, and any position in it can be reached by setting `counter`.
+    Subclasses random.Random, so uniform/choice/randint all work as usual.
+    """
+
+    def __init__(self, seed, stream=0):
+        self.stream_seed = seed
+        self.stream = stream
+        self.key = hashlib.blake2b(_KEY.pack(seed, stream), digest_size=32).digest()
+        self.counter = 0
+        super().__init__(0)
+
+    def seed(self, a=None, version=2):
+        # Position is the only state; (re)seeding rewinds to the stream start
+        self.counter = 0
+
+    def next_block(self):
+        block = hashlib.blake2b(_BLOCK.pack(self.counter), key=self.key, digest_size=8).digest()
+        self.counter += 1
+        return _BLOCK.unpack(block)[0]
+
+    def random(self):
+        return (self.next_block() >> 11) * (1.0 / 9007199254740992.0)
+
+    def getrandbits(self, k):
+        if k < 0:
+            raise ValueError("number of bits must be non-negative")
+        value = 0
+        bits = 0
+        while bits < k:
+            value = (value << 64) | self.next_block()
+            bits += 64
+        return value >> (bits - k)
+
+    def getstate(self):
+        return (self.stream_seed, self.stream, self.counter)
+
+    def setstate(self, state):
+        seed, stream, counter = state
+        if (seed, stream) != (self.stream_seed, self.stream):
+            self.__init__(seed, stream)
+        self.counter = counter
+
+
+def play_rng(seed, play):
+    return CounterRNG(seed, play)
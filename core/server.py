@@ -0,0 +1,143 @@
+import asyncio
+import argparse
+import os
+from datetime import datetime
+
+from .prizemanager import PrizeManager, new_session
+from .board import load_board, slot_index_at, step_ball
+from .simulation import launch_ball, MAX_STEPS
+from .rng import play_rng
+from . import protocol
+
+# Steps simulated between yields when the client only wants the outcome
+STEPS_PER_YIELD = 256
+
+
+class GameServer:
+    """Authoritative headless Plinko server.
+
+    Runs the same Ball/PinballLauncher physics as the pygame front end, but
+    without a display, for any number of concurrent kiosk sessions. Stock and
+    seeded outcomes live here only, so every kiosk draws from one inventory.
+    """
+
+    def __init__(self, seed=None, db_path=os.path.join('db','prizes.db'), play_log=None, board_path=None):
+        self.seed = seed if seed is not None else int(datetime.now().timestamp() * 1000000)
+        # Every server run is a new session, so reusing a seed never finds old awards
+        self.session = new_session()
+
+        self.board = load_board(board_path)
+        self.reward_slots = self.board.reward_slots
+        self.prize_manager = PrizeManager(db_path)
+
+        # 'play power slot' lines, verifiable with python -m core.simulation --log
+        self.play_log = open(play_log, 'a', buffering=1) if play_log else None
+        if self.play_log:
+            self.play_log.write(f"# seed {self.seed}\n")
+
+        self.plays = 0
+        self.active_sessions = 0
+        self.total_sessions = 0
+
+    def resolve(self, ball, play):
+        """Award the slot under a landed ball; returns (slot index, prize name, awarded)"""
+        slot = slot_index_at(ball.x, self.reward_slots)
+        if slot is not None:
+            prize_name = self.reward_slots[slot][0]
+            if self.prize_manager.award_prize(prize_name, self.session, play):
+                return slot, prize_name, True
+        return slot, "No Prize", False
+
+    async def play(self, power, stride, writer):
+        # Each play draws from its own (seed, play) stream, so interleaving
+        # between sessions never changes what any single play does.
+        self.plays += 1
+        play = self.plays
+        ball = launch_ball(power, play_rng(self.seed, play), self.board)
+
+        steps = 0
+        frames = []
+        status = None if ball is not None else 'failed'
+        while status is None and steps < MAX_STEPS:
+            status = step_ball(ball, self.board)
+            steps += 1
+            if status == 'failed':
+                # Didn't clear the launch tube; nothing was played
+                break
+            if stride and steps % stride == 0:
+                frames.append((ball.x, ball.y))
+                if len(frames) == protocol.MAX_FRAMES_PER_MESSAGE:
+                    writer.write(protocol.pack_frames(frames))
+                    frames = []
+                    await writer.drain()
+            elif not stride and steps % STEPS_PER_YIELD == 0:
+                await asyncio.sleep(0)
+
+        if stride and status != 'failed' and steps % stride:
+            # Always finish on the resting position so replays end where the ball landed
+            frames.append((ball.x, ball.y))
+
+        if status == 'failed':
+            slot, name, awarded = None, "", False
+        elif status == 'landed':
+            slot, name, awarded = self.resolve(ball, play)
+        else:
+            slot, name, awarded = None, "No Prize", False
+        if name and self.play_log:
+            self.play_log.write(f"{play} {power!r} {'-' if slot is None else slot}\n")
+
+        if frames:
+            writer.write(protocol.pack_frames(frames))
+        writer.write(protocol.pack_outcome(play, slot, awarded, steps, name))
+        await writer.drain()
+
+    async def handle_session(self, reader, writer):
+        self.active_sessions += 1
+        self.total_sessions += 1
+        try:
+            while True:
+                try:
+                    stride, power = protocol.LAUNCH.unpack(await reader.readexactly(protocol.LAUNCH.size))
+                except asyncio.IncompleteReadError:
+                    break
+                await self.play(power, stride, writer)
+        except ConnectionError:
+            pass
+        finally:
+            self.active_sessions -= 1
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_session, host, port)
+        print(f"Plinko server on {host}:{port} with seed {self.seed}")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.prize_manager.close()
+        if self.play_log:
+            self.play_log.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless authoritative Plinko server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--db', default=os.path.join('db','prizes.db'))
+    parser.add_argument('--play-log', default=None, help="append 'play power slot' lines for later verification")
+    parser.add_argument('--board', default=None, help="board TOML overriding the [board] table of gameconfig.toml")
+    args = parser.parse_args()
+
+    game_server = GameServer(seed=args.seed, db_path=args.db, play_log=args.play_log, board_path=args.board)
+    try:
+        asyncio.run(game_server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        game_server.close()
+        print(f"\n{game_server.plays} plays over {game_server.total_sessions} sessions with seed {game_server.seed}")
+
+
+if __name__ == "__main__":
+    main()
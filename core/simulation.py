@@ -0,0 +1,96 @@
+import argparse
+from multiprocessing import Pool
+
+from .launcher import PinballLauncher
+from .board import load_board, slot_index_at, step_ball, LAUNCHER_X, LAUNCHER_Y
+from .rng import play_rng
+
+# A ball that neither lands nor leaves the board within this many steps is
+# treated as lost so a bad launch can never hang a simulation.
+MAX_STEPS = 6000
+
+
+def launch_ball(power, rng, board=None):
+    launcher = PinballLauncher(LAUNCHER_X, LAUNCHER_Y)
+    launcher.power = max(0.0, min(launcher.max_power, power))
+    ball, _ = launcher.launch(rng=rng)
+    if ball is not None and board is not None:
+        ball.radius = board.ball_radius
+    return ball
+
+
+def simulate_play(seed, play, power, board=None):
+    """Re-simulate one play from (seed, play, power) alone.
+
+    Returns a dict with the final status ('landed', 'lost', 'failed' or
+    'timeout'), the slot index (None unless landed on a slot), the step
+    count and the final position. Stock is not consulted.
+    """
+    board = board if board is not None else load_board()
+
+    ball = launch_ball(power, play_rng(seed, play), board)
+    if ball is None:
+        return {'status': 'failed', 'slot': None, 'steps': 0, 'x': None, 'y': None}
+
+    status = None
+    steps = 0
+    while status is None and steps < MAX_STEPS:
+        status = step_ball(ball, board)
+        steps += 1
+
+    slot = slot_index_at(ball.x, board.reward_slots) if status == 'landed' else None
+    return {'status': status or 'timeout', 'slot': slot, 'steps': steps, 'x': ball.x, 'y': ball.y}
+
+
+_worker_board = None
+
+
+def _init_worker(board_path):
+    global _worker_board
+    _worker_board = load_board(board_path)
+
+
+def _verify_entry(args):
+    seed, play, power, expected = args
+    result = simulate_play(seed, play, power, _worker_board)
+    return play, expected, result['slot'], expected == result['slot']
+
+
+def verify_log(seed, entries, processes=None, board_path=None):
+    """Check (play, power, expected slot) entries in parallel; returns mismatches"""
+    jobs = [(seed, play, power, expected) for play, power, expected in entries]
+    with Pool(processes, initializer=_init_worker, initargs=(board_path,)) as pool:
+        results = pool.map(_verify_entry, jobs, chunksize=16)
+    return [r for r in results if not r[3]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-simulate or verify individual Plinko plays")
+    parser.add_argument('--seed', type=int, required=True)
+    parser.add_argument('--play', type=int, help="play number to re-simulate")
+    parser.add_argument('--power', type=float, help="launch power of that play")
+    parser.add_argument('--log', help="file of 'play power slot' lines to verify in parallel ('-' slot for none)")
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--board', default=None, help="board TOML the plays were made on")
+    args = parser.parse_args()
+
+    if args.log:
+        entries = []
+        with open(args.log) as f:
+            for line in f:
+                if not line.strip() or line.startswith('#'):
+                    continue
+                play, power, slot = line.split()
+                entries.append((int(play), float(power), None if slot == '-' else int(slot)))
+        mismatches = verify_log(args.seed, entries, args.processes, args.board)
+        print(f"{len(entries) - len(mismatches)}/{len(entries)} plays verified")
+        for play, expected, got, _ in mismatches:
+            print(f"  play {play}: logged slot {expected}, simulated slot {got}")
+    elif args.play is not None and args.power is not None:
+        print(simulate_play(args.seed, args.play, args.power, load_board(args.board)))
+    else:
+        parser.error("give --play and --power, or --log")
+
+
+if __name__ == "__main__":
+    main()
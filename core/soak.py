@@ -0,0 +1,216 @@
+import argparse
+import contextlib
+import io
+import os
+import random
+import resource
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tomllib
+
+# Headless before pygame is imported anywhere
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+import pygame
+
+# Accelerated soak test: drives PlinkoGame with synthetic clicks and charge
+# sequences, unthrottled and under the dummy video driver, and watches for the
+# slow leaks and slowdowns that otherwise only show up after a day on site.
+#
+#   python -m core.soak --plays 5000 --draw-every 10
+
+with open(os.path.join("core",'gameconfig.toml'), 'rb') as conf:
+    GAME_CONFIGS = tomllib.load(conf)
+    SOAK = GAME_CONFIGS['soak']
+    FORECAST = GAME_CONFIGS['forecast']
+
+# Frame-time drift compares the median of WINDOW samples after the first
+# WARMUP ones (caches, pygame surfaces and the forecast thread still settling)
+# with the median of the last WINDOW samples
+WARMUP_SAMPLES = 1
+WINDOW_SAMPLES = 3
+
+
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError):
+        # No procfs; peak RSS is the best we can do (KiB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def distribution_drift(first, second):
+    """Total variation distance between two outcome count dicts"""
+    first_total = sum(first.values()) or 1
+    second_total = sum(second.values()) or 1
+    keys = set(first) | set(second)
+    return 0.5 * sum(abs(first.get(k, 0) / first_total - second.get(k, 0) / second_total) for k in keys)
+
+
+class SyntheticPlayer:
+    """Produces the events a visitor would, one frame at a time"""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.hold = 0
+        self.wait = 0
+
+    def click(self, event_type, pos):
+        return pygame.event.Event(event_type, button=1, pos=pos)
+
+    def events(self, game):
+        pos = (self.rng.randint(300, 700), self.rng.randint(200, 600))
+        events = []
+        if self.rng.random() < 0.3:
+            events.append(pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(1, 1), buttons=(0, 0, 0)))
+
+        if game.state == "splash":
+            events.append(self.click(pygame.MOUSEBUTTONDOWN, pos))
+        elif game.state == "playing":
+            if game.mouse_pressed:
+                self.hold -= 1
+                if self.hold <= 0:
+                    events.append(self.click(pygame.MOUSEBUTTONUP, pos))
+            elif not any(ball.active for ball in game.balls):
+                # Roughly the spread of charge times seen on a real kiosk
+                self.hold = self.rng.randint(15, 100)
+                events.append(self.click(pygame.MOUSEBUTTONDOWN, pos))
+        elif game.state == "result":
+            self.wait += 1
+            if self.wait > 3:
+                self.wait = 0
+                events.append(self.click(pygame.MOUSEBUTTONDOWN, pos))
+        return events
+
+
+def run_soak(plays, sample_every, draw_every, seed, stock):
+    import mainv2
+    from core.prizemanager import PrizeManager
+
+    # Never touch the real inventory or caches: soak against restocked copies
+    workdir = tempfile.mkdtemp(prefix='plinko-soak-')
+    db_path = os.path.join(workdir, 'prizes.db')
+    shutil.copy(os.path.join('db', 'prizes.db'), db_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('UPDATE prizes SET count = ?', (stock,))
+    cache_path = os.path.join(workdir, 'slot_odds.json')
+    if os.path.exists(FORECAST['cache_path']):
+        shutil.copy(FORECAST['cache_path'], cache_path)
+
+    quiet = io.StringIO()
+    with contextlib.redirect_stdout(quiet):
+        game = mainv2.PlinkoGame(seed=seed, prize_manager=PrizeManager(db_path), forecast_cache=cache_path)
+    player = SyntheticPlayer(random.Random(seed))
+
+    samples = []
+    outcomes = {}
+    halves = ({}, {})
+    seen = 0
+    window_frames = 0
+    window_time = 0.0
+    started = time.perf_counter()
+
+    try:
+        while len(game.recorded_outcomes) < plays:
+            frame_start = time.perf_counter()
+            with contextlib.redirect_stdout(quiet):
+                game.handle_events(player.events(game))
+                game.update()
+            if draw_every and window_frames % draw_every == 0:
+                snap = game.snapshot()
+                if snap.state == "splash":
+                    game.draw_splash_screen()
+                else:
+                    game.draw_game(snap)
+                    if snap.state == "result":
+                        game.draw_result_screen(snap)
+            window_time += time.perf_counter() - frame_start
+            window_frames += 1
+            quiet.seek(0)
+            quiet.truncate()
+
+            while seen < len(game.recorded_outcomes):
+                name = game.recorded_outcomes[seen][0]
+                seen += 1
+                outcomes[name] = outcomes.get(name, 0) + 1
+                half = halves[0] if seen <= plays // 2 else halves[1]
+                half[name] = half.get(name, 0) + 1
+
+                if seen % sample_every == 0:
+                    samples.append({
+                        'plays': seen,
+                        'rss_mb': rss_mb(),
+                        'frame_ms': window_time / window_frames * 1000,
+                        'db_kb': os.path.getsize(db_path) / 1024,
+                        'balls': len(game.balls),
+                    })
+                    window_frames = 0
+                    window_time = 0.0
+                    s = samples[-1]
+                    print(f"{s['plays']:>7} plays  rss {s['rss_mb']:7.1f} MB  frame {s['frame_ms']:6.3f} ms  "
+                          f"db {s['db_kb']:8.1f} KB  balls {s['balls']}")
+    finally:
+        game.prize_manager.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    elapsed = time.perf_counter() - started
+    print(f"\n{plays} plays in {elapsed:.1f}s with seed {seed}")
+    total = sum(outcomes.values())
+    for name, count in sorted(outcomes.items(), key=lambda item: -item[1]):
+        print(f"  {name}: {count} ({count / total:.1%})")
+    return samples, halves
+
+
+def check_bounds(samples, halves, bounds):
+    """Returns a list of human-readable bound violations"""
+    if len(samples) < WARMUP_SAMPLES + 2 * WINDOW_SAMPLES:
+        return ["not enough samples; raise --plays or lower --sample-every"]
+    first, last = samples[0], samples[-1]
+    failures = []
+
+    rss_growth = last['rss_mb'] - first['rss_mb']
+    if rss_growth > bounds['max_rss_growth_mb']:
+        failures.append(f"RSS grew {rss_growth:.1f} MB (limit {bounds['max_rss_growth_mb']} MB)")
+
+    baseline = statistics.median(s['frame_ms'] for s in samples[WARMUP_SAMPLES:WARMUP_SAMPLES + WINDOW_SAMPLES])
+    current = statistics.median(s['frame_ms'] for s in samples[-WINDOW_SAMPLES:])
+    drift = current / baseline - 1 if baseline else 0.0
+    if drift > bounds['max_frame_time_drift']:
+        failures.append(f"frame time drifted {drift:+.0%} (limit {bounds['max_frame_time_drift']:+.0%})")
+
+    db_growth = last['db_kb'] - first['db_kb']
+    if db_growth > bounds['max_db_growth_kb']:
+        failures.append(f"DB grew {db_growth:.1f} KB (limit {bounds['max_db_growth_kb']} KB)")
+
+    outcome_drift = distribution_drift(*halves)
+    if outcome_drift > bounds['max_outcome_drift']:
+        failures.append(f"outcome distribution drifted {outcome_drift:.3f} between halves (limit {bounds['max_outcome_drift']})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accelerated soak test with synthetic input")
+    parser.add_argument('--plays', type=int, default=SOAK['plays'])
+    parser.add_argument('--sample-every', type=int, default=SOAK['sample_every'])
+    parser.add_argument('--draw-every', type=int, default=0, metavar='N',
+                        help="also run the draw functions every N frames (0 = never)")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    failures = check_bounds(*run_soak(args.plays, args.sample_every, args.draw_every, args.seed, SOAK['stock']), SOAK)
+    if failures:
+        print("\nSOAK FAILED")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nSoak passed")
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,24 @@ import random
 import math
 import sys
 import tomllib, os
+import argparse
+import time
 from datetime import datetime
 
 # Game comps
-from core.ball import Ball
+from core.ball import Ball, draw_ball
 from core.launcher import PinballLauncher
 from core.buttons import Button 
-from core.prizemanager import PrizeManager
+from core.prizemanager import PrizeManager, new_session
+from core.board import load_board, slot_index_at, is_landed, is_lost, NO_PRIZE, LAUNCHER_X, LAUNCHER_Y
+from core.rng import CounterRNG, SPLASH_STREAM, play_rng
+from core.remote import RemoteClient, ReplayBall
+from core.physics_thread import PhysicsThread, GameSnapshot
+from core.events import InputPipeline
+from core.forecast import StockoutForecaster
+from core.outcomes import OutcomeTable, load_table
+from core.quality import QualityGovernor, QUALITY_NAMES
+from core.recovery import SnapshotWriter, load_snapshot, snapshot_seed, restore_state
 
 # Initialize Pygame
 pygame.init()
@@ -20,6 +31,7 @@ with open(os.path.join("core","gameconfig.toml"), 'rb') as conf:
     COLORS = GAME_CONFIGS['colormaps']
     BALLPHYSICS = GAME_CONFIGS['ball_physics']
     PEG_DISTANCE = GAME_CONFIGS['peg_distances']
+    OUTCOMES = GAME_CONFIGS['outcomes']
 
 SCREEN_WIDTH = VIEW['SCREEN_WIDTH']
 SCREEN_HEIGHT = VIEW['SCREEN_HEIGHT']
@@ -27,20 +39,27 @@ PEG_RADIUS = VIEW['PEG_RADIUS']
 FPS = VIEW['FPS']
 
 class PlinkoGame:
-    def __init__(self, seed=None):
+    def __init__(self, seed=None, server=None, threaded_physics=False, recovery_path=None, quality=None, board=None,
+                 outcomes=None, quick_draw=False, prize_manager=None, forecast_cache=None):
         # Set seed FIRST before any random calls
+        # A recovery snapshot left by a crash overrides the requested seed
+        recovered = load_snapshot(recovery_path) if recovery_path else None
+        if recovered is not None:
+            seed = snapshot_seed(recovered)
 
         #####INIT#####
         self.selected_prize = None
         self.temp_input = None
         self.seed = seed if seed is not None else int(datetime.now().timestamp() * 1000000)
+        # Awards are keyed by this run; a resumed snapshot restores its session
+        self.session = new_session()
         random.seed(self.seed)
-
-        self.ball_rng = random.Random(self.seed + 1)
         
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("DOST 3 Plinko Reward Game")
         self.clock = pygame.time.Clock()
+        # Adaptive unless a fixed quality level is requested
+        self.governor = QualityGovernor(FPS, fixed=quality)
         
         self.logo = pygame.image.load(os.path.join("resources","dost_logo.png")).convert_alpha()
         self.logo = pygame.transform.smoothscale(self.logo, (150, 150))
@@ -48,6 +67,7 @@ class PlinkoGame:
         # Game states
         self.launched_once = False
         self.state = "splash"
+        self.ticks = 0
         self.font_large = pygame.font.Font(None, 65)
         self.font_medium = pygame.font.Font(None, 42)
         self.font_sm_medium = pygame.font.Font(None, 35)
@@ -55,13 +75,19 @@ class PlinkoGame:
         self.font_tiny = pygame.font.Font(None, 12)
 
         # Game objects - create AFTER seeding
-        self.ball_rng = random.Random(self.seed + 1)
+        # Every play k gets its own counter-based stream derived from (seed, k),
+        # so any single play can be re-simulated without replaying the others.
+        self.plays = 0
 
         self.balls = []
-        self.pegs = self.create_pegs()
-        self.reward_slots = self.create_reward_slots()
-        self.prize_manager = PrizeManager()
-        self.launcher = PinballLauncher(80, SCREEN_HEIGHT // 2 + 60, ball_rng=self.ball_rng)
+        self.board = board if board is not None else load_board()
+        self.pegs = self.board
+        self.reward_slots = self.board.reward_slots
+        # Static board art is drawn once per render quality and blitted each frame
+        self.board_surface = None
+        self.board_surface_layered = None
+        self.prize_manager = prize_manager if prize_manager is not None else PrizeManager()
+        self.launcher = PinballLauncher(LAUNCHER_X, LAUNCHER_Y)
         self.back_button = Button(20, 20, 100, 40, "Back", COLORS['BLUE'], COLORS['WHITE'])
 
         # UI / result vars
@@ -71,56 +97,92 @@ class PlinkoGame:
 
         self.edit_prizes_button = Button(SCREEN_WIDTH - 150, 20, 130, 40, "Edit Prizes", COLORS['BLUE'], COLORS['WHITE'])
         self.editing_prizes = False
-        self.prize_inputs = []
+
+        # Prize editor layout, fixed once the prize list is known
+        editor_x = (SCREEN_WIDTH - 400) // 2
+        editor_y = (SCREEN_HEIGHT - 500) // 2
+        self.editor_rect = pygame.Rect(editor_x, editor_y, 400, 500)
+        self.prize_input_rects = {
+            prize_name: pygame.Rect(editor_x + 200, editor_y + 100 + i * 50, 100, 30)
+            for i, prize_name in enumerate(self.prize_manager.prizes)
+        }
+        self.save_button = Button(editor_x + 150, editor_y + 440, 100, 40, "Save", COLORS['GREEN'], COLORS['WHITE'])
+        # Text-input state: edits stay pending until Save writes them in one transaction
+        self.prize_edits = {}
+        self.editor_redraw = True
+        self.editor_dirty = set()
 
         self.recorded_outcomes = []
+        # Plays finished so far; after a resume recorded_outcomes only holds
+        # the most recent of them (see core.recovery)
+        self.outcome_count = 0
+
+        # Input handlers by screen and event type; anything else is dropped
+        self.input = InputPipeline()
+        self.launch_frame = None
+        self.event_handlers = {
+            ("splash", pygame.MOUSEBUTTONDOWN): self.on_splash_click,
+            ("splash", pygame.MOUSEMOTION): self.edit_prizes_button.handle_event,
+            ("editor", pygame.MOUSEBUTTONDOWN): self.handle_editor_event,
+            ("editor", pygame.KEYDOWN): self.handle_editor_event,
+            ("editor", pygame.WINDOWEXPOSED): self.handle_editor_event,
+            ("playing", pygame.MOUSEBUTTONDOWN): self.on_playing_press,
+            ("playing", pygame.MOUSEBUTTONUP): self.on_playing_release,
+            ("playing", pygame.MOUSEMOTION): self.back_button.handle_event,
+            ("result", pygame.MOUSEBUTTONDOWN): self.on_result_event,
+            ("result", pygame.MOUSEBUTTONUP): self.on_result_event,
+            ("result", pygame.MOUSEMOTION): self.on_result_event,
+            ("result", pygame.KEYDOWN): self.on_result_event,
+        }
+
+        # Thin-client mode: physics, stock and outcomes come from core.server
+        self.remote = None
+        self.server_error = None
+        if server is not None:
+            host, port = server
+            self.remote = RemoteClient(host, port)
+
+        # Precomputed outcome table, used only if it was built for this seed and board.
+        # Its plays are dealt from a cursor in the prize database, so each row
+        # (and each RNG stream of the seed) is used once across all runs.
+        self.outcomes = None
+        self.table_key = None
+        if outcomes is not None and self.remote is None:
+            self.outcomes = load_table(outcomes, self.seed, self.board)
+            if self.outcomes is None and quick_draw:
+                print(f"No outcome table for seed {self.seed} and this board at {outcomes}; quick draw is off")
+        if self.outcomes is not None:
+            self.table_key = self.outcomes.key
+            if not self.outcomes.covers(self.prize_manager.next_table_play(self.table_key)):
+                self.close_outcomes()
+        # Quick draw settles covered plays on release instead of flying the ball
+        self.quick_draw = quick_draw and self.outcomes is not None
+
+        # Stockout forecast; in thin-client mode stock lives on the server
+        self.forecaster = None
+        self.stock_forecast = None
+        self.stock_warnings = []
+        if self.remote is None:
+            if forecast_cache is not None:
+                self.forecaster = StockoutForecaster(self.board, cache_path=forecast_cache)
+            else:
+                self.forecaster = StockoutForecaster(self.board)
+            self.forecaster.start()
         
         # Store splash screen dots deterministically
-        self.splash_dots = [(random.randint(0, SCREEN_WIDTH), 
-                            random.randint(0, SCREEN_HEIGHT),
-                            random.choice([COLORS['YELLOW'], COLORS['GOLD'], COLORS['WHITE'], COLORS['CYAN']]))
+        splash_rng = CounterRNG(self.seed, SPLASH_STREAM)
+        self.splash_dots = [(splash_rng.randint(0, SCREEN_WIDTH), 
+                            splash_rng.randint(0, SCREEN_HEIGHT),
+                            splash_rng.choice([COLORS['YELLOW'], COLORS['GOLD'], COLORS['WHITE'], COLORS['CYAN']]))
                            for _ in range(40)]
 
-    def create_pegs(self):
-        pegs = []
-        rows = 12
-        start_y = 180
-        horizontal_spacing = PEG_DISTANCE['h_spacing']
-        vertical_spacing = PEG_DISTANCE['v_spacing']
-
-        for row in range(rows):
-            y = start_y + row * vertical_spacing
-            pegs_in_row = 3 + row
-            start_x = SCREEN_WIDTH // 2 - (pegs_in_row - 1) * (horizontal_spacing / 2)
-            for i in range(pegs_in_row):
-                x = start_x + i * horizontal_spacing
-                # Deterministic jitter based on seed
-                jitter = 4 if row % 2 == 0 else -4
-                pegs.append((int(x + jitter), int(y)))
-        return pegs
-
-    def create_reward_slots(self):
-        #preload prize_array
-        with open(os.path.join('core','prize_arrangement.toml'), 'rb') as f:
-            data = tomllib.load(f); f.close()
-
-        pz_arr = data['prize_array']
-
-        very_common_color = (122, 215, 81)
-        common_color = (68, 191, 112)
-        uncommon_color = (52, 94, 141)
-        grand_prize_color = (189, 223, 38)
-
-        rewards = [
-            (pz_arr['p1'], 20, grand_prize_color, 1.0),
-            (pz_arr['p2'], 30, uncommon_color, 1.0),
-            (pz_arr['p3'], 40, common_color, 1.0),
-            (pz_arr['p4'], 50, very_common_color, 1.0),
-            (pz_arr['p5'], 20, common_color, 1.0),
-            (pz_arr['p6'], 30, uncommon_color, 1.0),
-            (pz_arr['p7'], 20, grand_prize_color, 1.0)
-        ]
-        return rewards
+        if recovered is not None:
+            restore_state(self, recovered)
+            print(f"Resumed from {recovery_path}: {self.state}, play {self.plays}, seed {self.seed}")
+        self.recovery = SnapshotWriter(recovery_path) if recovery_path else None
+
+        # Optional physics thread; the render loop then only draws snapshots
+        self.physics = PhysicsThread(self) if threaded_physics else None
 
     def draw_splash_screen(self):
         self.screen.fill((20, 50, 80))
@@ -163,115 +225,141 @@ class PlinkoGame:
                 self.screen.blit(text, text_rect)
 
         # Use pre-generated dots for determinism
-        for x, y, color in self.splash_dots:
-            pygame.draw.circle(self.screen, color, (x, y), 2)
+        if self.governor.quality.splash_dots:
+            for x, y, color in self.splash_dots:
+                pygame.draw.circle(self.screen, color, (x, y), 2)
+
+        # Slot odds are simulated in the background; forecast once they arrive
+        if self.forecaster is not None and self.stock_forecast is None and self.forecaster.ready:
+            self.update_forecast()
+        for i, line in enumerate(self.stock_warnings[:3]):
+            warning = self.font_small.render(line, True, COLORS['RED'])
+            warning_rect = warning.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - 70 + i * 25))
+            self.screen.blit(warning, warning_rect)
+
+        # Stock lives on the server in thin-client mode; the local editor would edit nothing
+        if self.remote is None:
+            self.edit_prizes_button.draw(self.screen)
 
-        self.edit_prizes_button.draw(self.screen)
+    def draw_prize_editor(self):
+        """Draw the prize editor over the splash screen; returns the screen areas that changed.
 
-        if self.editing_prizes:
-            self.draw_prize_editor()
+        The splash, window and every field are drawn once when the editor
+        opens; after that only the fields in editor_dirty are redrawn.
+        """
+        if self.forecaster is not None and self.stock_forecast is None and self.forecaster.ready:
+            self.update_forecast(self.edited_stock())
+            self.editor_dirty.update(self.prize_input_rects)
+
+        if not self.editor_redraw:
+            dirty = [self.draw_prize_field(prize_name) for prize_name in self.editor_dirty]
+            self.editor_dirty.clear()
+            return dirty
+
+        self.draw_splash_screen()
 
-    def draw_prize_editor(self):
         # Draw semi-transparent overlay
         overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
         overlay.set_alpha(180)
         overlay.fill(COLORS['BLACK'])
         self.screen.blit(overlay, (0, 0))
 
-        # Draw editor window
-        box_width = 400
-        box_height = 500
-        box_x = (SCREEN_WIDTH - box_width) // 2
-        box_y = (SCREEN_HEIGHT - box_height) // 2
-        
         # Draw main window
-        pygame.draw.rect(self.screen, COLORS['WHITE'], (box_x, box_y, box_width, box_height))
-        pygame.draw.rect(self.screen, COLORS['GOLD'], (box_x, box_y, box_width, box_height), 5)
+        pygame.draw.rect(self.screen, COLORS['WHITE'], self.editor_rect)
+        pygame.draw.rect(self.screen, COLORS['GOLD'], self.editor_rect, 5)
 
         # Draw title
         title = self.font_small.render("Edit Prizes", True, COLORS['BLACK'])
-        title_rect = title.get_rect(center=(SCREEN_WIDTH//2, box_y + 40))
+        title_rect = title.get_rect(center=(SCREEN_WIDTH//2, self.editor_rect.y + 40))
         self.screen.blit(title, title_rect)
 
-        # Draw prize entries
-        y_offset = box_y + 100
-        for i, prize_name in enumerate(self.prize_manager.prizes.keys()):
+        for prize_name, input_rect in self.prize_input_rects.items():
             text = self.font_small.render(f"{prize_name}: ", True, COLORS['BLACK'])
-            self.screen.blit(text, (box_x + 20, y_offset + i * 50))
-            
-            # Draw input box
-            input_rect = pygame.Rect(box_x + 200, y_offset + i * 50, 100, 30)
-            pygame.draw.rect(self.screen, COLORS['BLACK'], input_rect, 2)
-            
-            if hasattr(self, 'selected_prize') and self.selected_prize == prize_name:
-                pygame.draw.rect(self.screen, COLORS['CYAN'], input_rect, 2)
-                value_text = self.font_small.render(str(self.temp_input), True, COLORS['BLACK'])
-            else:
-                value_text = self.font_small.render(str(self.prize_manager.prizes[prize_name]), True, COLORS['BLACK'])
-            self.screen.blit(value_text, (input_rect.x + 5, input_rect.y + 5))
-
-        # Draw save button - this was missing!
-        save_button = Button(
-            box_x + box_width//2 - 50,  # x position
-            box_y + box_height - 60,     # y position
-            100,                         # width
-            40,                          # height
-            "Save",                      # text
-            COLORS['GREEN'],             # button color
-            COLORS['WHITE']              # text color
+            self.screen.blit(text, (self.editor_rect.x + 20, input_rect.y))
+            self.draw_prize_field(prize_name)
+
+        self.save_button.draw(self.screen)
+
+        self.editor_redraw = False
+        self.editor_dirty.clear()
+        return [self.screen.get_rect()]
+
+    def draw_prize_field(self, prize_name):
+        """Redraw one input box and its forecast; returns the area drawn"""
+        input_rect = self.prize_input_rects[prize_name]
+        # Box plus the forecast label to its right, up to the window border
+        area = pygame.Rect(input_rect.x, input_rect.y, self.editor_rect.right - 5 - input_rect.x, input_rect.height)
+        pygame.draw.rect(self.screen, COLORS['WHITE'], area)
+        pygame.draw.rect(self.screen, COLORS['BLACK'], input_rect, 2)
+
+        if self.selected_prize == prize_name:
+            pygame.draw.rect(self.screen, COLORS['CYAN'], input_rect, 2)
+            value = self.temp_input
+        else:
+            value = self.prize_edits.get(prize_name, self.prize_manager.prizes[prize_name])
+        value_text = self.font_small.render(str(value), True, COLORS['BLACK'])
+        self.screen.blit(value_text, (input_rect.x + 5, input_rect.y + 5))
+
+        # Expected plays until this prize runs out
+        if self.stock_forecast and prize_name in self.stock_forecast:
+            expected = self.stock_forecast[prize_name].expected
+            label = "never" if expected == math.inf else f"~{expected:.0f}"
+            forecast_text = self.font_small.render(label, True, COLORS['GRAY'])
+            self.screen.blit(forecast_text, (input_rect.right + 10, input_rect.y + 5))
+        return area
+
+    def snapshot(self):
+        return GameSnapshot(
+            tick=self.ticks,
+            state=self.state,
+            balls=tuple(ball.snapshot() for ball in self.balls),
+            launcher_power=self.launcher.power,
+            launcher_charging=self.launcher.charging,
+            last_reward=self.last_reward,
+            server_error=self.server_error,
         )
-        save_button.draw(self.screen)
 
-    def draw_game(self):
-        self.screen.fill((30, 30, 50))
-        self.back_button.draw(self.screen)
-        
+    def render_board(self, layered_pegs):
+        surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        surface.fill((30, 30, 50))
+
         title = self.font_medium.render("DOST 3 Plinko Game", True, COLORS['GOLD'])
         title_rect = title.get_rect(center=(SCREEN_WIDTH//2, 30))
-        self.screen.blit(title, title_rect)
-
-        for peg in self.pegs:
-            pygame.draw.circle(self.screen, COLORS['WHITE'], peg, PEG_RADIUS)
-            pygame.draw.circle(self.screen, COLORS['SILVER'], peg, PEG_RADIUS - 2)
+        surface.blit(title, title_rect)
 
-        slot_count = len(self.reward_slots)
-        slot_y = SCREEN_HEIGHT - 80
-        base_slot_width = 80
+        instruction1 = self.font_small.render("Hold LEFT CLICK to charge, release to shoot STRAIGHT UP!", True, COLORS['WHITE'])
+        instruction1_rect = instruction1.get_rect(center=(SCREEN_WIDTH//2, 70))
+        surface.blit(instruction1, instruction1_rect)
 
-        total_width = sum(base_slot_width * mult for _, _, _, mult in self.reward_slots)
-        x_offset = (SCREEN_WIDTH - total_width) / 2
+        self.board.draw(surface, layered_pegs)
+        return surface
 
-        current_x = x_offset
-        for i, (reward, points, color, width_mult) in enumerate(self.reward_slots):
-            slot_width = base_slot_width * width_mult
-            pygame.draw.rect(self.screen, color, (current_x, slot_y, slot_width, 80))
-            pygame.draw.rect(self.screen, COLORS['BLACK'], (current_x, slot_y, slot_width, 80), 2)
-            current_x += slot_width
+    def draw_game(self, snap):
+        quality = self.governor.quality
+        if self.board_surface is None or self.board_surface_layered != quality.layered_pegs:
+            self.board_surface = self.render_board(quality.layered_pegs)
+            self.board_surface_layered = quality.layered_pegs
+        self.screen.blit(self.board_surface, (0, 0))
+        self.back_button.draw(self.screen)
 
-        for ball in self.balls:
-            ball.draw(self.screen)
+        for x, y, color, radius, active in snap.balls:
+            if active:
+                draw_ball(self.screen, x, y, color, radius, quality.highlights)
 
-        self.launcher.draw(self.screen)
+        self.launcher.draw(self.screen, snap.launcher_power, snap.launcher_charging, quality)
 
-        instruction1 = self.font_small.render("Hold LEFT CLICK to charge, release to shoot STRAIGHT UP!", True, COLORS['WHITE'])
-        instruction1_rect = instruction1.get_rect(center=(SCREEN_WIDTH//2, 70))
-        self.screen.blit(instruction1, instruction1_rect)
+        if snap.server_error:
+            error_text = self.font_small.render(snap.server_error, True, COLORS['RED'])
+            error_rect = error_text.get_rect(center=(SCREEN_WIDTH//2, 110))
+            self.screen.blit(error_text, error_rect)
 
-        if self.launcher.charging:
-            power_text = self.font_small.render(f"Power: {int((self.launcher.power/self.launcher.max_power)*100)}%", True, COLORS['YELLOW'])
+        if snap.launcher_charging:
+            power_text = self.font_small.render(f"Power: {int((snap.launcher_power/self.launcher.max_power)*100)}%", True, COLORS['YELLOW'])
             power_rect = power_text.get_rect(center=(200, SCREEN_HEIGHT // 2 - 50))
             self.screen.blit(power_text, power_rect)
 
-        top_y = 120
-        bottom_y = SCREEN_HEIGHT - 90
-        rail_offset_x = 200
-
-        pygame.draw.line(self.screen, COLORS['WHITE'], (SCREEN_WIDTH//2 - rail_offset_x, top_y),
-                        (0, bottom_y), 4)
-        pygame.draw.line(self.screen, COLORS['WHITE'], (SCREEN_WIDTH//2 + rail_offset_x, top_y),
-                        (SCREEN_WIDTH, bottom_y), 4)
-
-    def draw_result_screen(self):
+    def draw_result_screen(self, snap):
+        last_reward = snap.last_reward
         overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
         overlay.set_alpha(180)
         overlay.fill(COLORS['BLACK'])
@@ -285,8 +373,8 @@ class PlinkoGame:
         pygame.draw.rect(self.screen, COLORS['WHITE'], (box_x, box_y, box_width, box_height))
         pygame.draw.rect(self.screen, COLORS['GOLD'], (box_x, box_y, box_width, box_height), 5)
 
-        if self.last_reward:
-            if self.last_reward[0] == "No Prize":
+        if last_reward:
+            if last_reward[0] == "No Prize":
                 message = self.font_medium.render("Better luck next time", True, COLORS['RED'])
                 message_rect = message.get_rect(center=(SCREEN_WIDTH//2, box_y + 100))
                 self.screen.blit(message, message_rect)
@@ -295,7 +383,7 @@ class PlinkoGame:
                 congrats_rect = congrats.get_rect(center=(SCREEN_WIDTH//2, box_y + 60))
                 self.screen.blit(congrats, congrats_rect)
 
-                reward_text = self.font_large.render(self.last_reward[0], True, self.last_reward[2])
+                reward_text = self.font_large.render(last_reward[0], True, last_reward[2])
                 reward_rect = reward_text.get_rect(center=(SCREEN_WIDTH//2, box_y + 130))
                 self.screen.blit(reward_text, reward_rect)
 
@@ -305,175 +393,246 @@ class PlinkoGame:
 
     def handle_events(self, events):
         for event in events:
-            if self.state == "splash":
-                if self.editing_prizes:
-                    if event.type == pygame.MOUSEBUTTONDOWN:
-                        mouse_pos = event.pos
-                        box_x = (SCREEN_WIDTH - 400) // 2
-                        box_y = (SCREEN_HEIGHT - 500) // 2
-                        box_width = 400
-                        box_height = 500
-
-                        # Check for clicks on input boxes
-                        y_offset = box_y + 100
-                        for i, prize_name in enumerate(self.prize_manager.prizes.keys()):
-                            input_rect = pygame.Rect(box_x + 200, y_offset + i * 50, 100, 30)
-                            if input_rect.collidepoint(mouse_pos):
-                                # Handle input box click
-                                current_value = str(self.prize_manager.prizes[prize_name])
-                                new_value = self.get_user_input(prize_name, current_value)
-                                if new_value is not None:
-                                    try:
-                                        new_value = int(new_value)
-                                        if new_value >= 0:
-                                            self.prize_manager.prizes[prize_name] = new_value
-                                    except ValueError:
-                                        pass
-
-                        # Check for save button click
-                        save_button_rect = pygame.Rect(box_x + box_width//2 - 50, 
-                                                    box_y + box_height - 60, 
-                                                    100, 40)
-                        if save_button_rect.collidepoint(mouse_pos):
-                            self.editing_prizes = False
-                            self.prize_manager.save_prizes()
-
-                        # Close editor if clicking outside the box
-                        editor_rect = pygame.Rect(box_x, box_y, box_width, box_height)
-                        if not editor_rect.collidepoint(mouse_pos):
-                            self.editing_prizes = False
-
-                else:
-                    # Handle normal splash screen events
-                    if event.type == pygame.MOUSEBUTTONDOWN:
-                        if self.edit_prizes_button.rect.collidepoint(event.pos):
-                            self.editing_prizes = True
-                        else:
-                            self.state = "playing"
-
-                    elif event.type == pygame.MOUSEMOTION:
-                        self.edit_prizes_button.handle_event(event)
-
-            elif self.state == "playing":
-                if self.back_button.handle_event(event):
-                    self.state = "splash"
-                    self.balls = []
-                    self.last_reward = None
-                    self.result_timer = 0
-
-                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    self.mouse_pressed = True
-                elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
-                    if self.mouse_pressed:
-                        if not any(ball.active for ball in self.balls):
-                            ball, power = self.launcher.launch()
-                            if ball:
-                                ball.rng = self.ball_rng
-                                self.balls.append(ball)
-                                if ball.launch_speed >= 0.5:
-                                    self.launched_once = True
-                        self.mouse_pressed = False
-
-                elif event.type == pygame.MOUSEMOTION:
-                    self.back_button.handle_event(event)
-
-            elif self.state == "result":
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    self.state = "playing"
-                    self.balls = []
-                    self.last_reward = None
-                    self.result_timer = 0
-
-                if not self.launched_once:
-                    self.launcher.power = self.launcher.max_power / 2
-                self.launched_once = False
-
-    def get_user_input(self, prize_name, current_value):
-        """Helper method to get user input for prize values"""
-        pygame.key.start_text_input()
+            screen = "editor" if self.state == "splash" and self.editing_prizes else self.state
+            handler = self.event_handlers.get((screen, event.type))
+            if handler is not None:
+                handler(event)
+
+    def on_splash_click(self, event):
+        if self.remote is None and self.edit_prizes_button.rect.collidepoint(event.pos):
+            self.open_prize_editor()
+        else:
+            self.state = "playing"
+
+    def on_playing_press(self, event):
+        if self.back_button.handle_event(event):
+            self.state = "splash"
+            self.balls = []
+            self.last_reward = None
+            self.result_timer = 0
+
+        if event.button == 1:
+            self.mouse_pressed = True
+
+    def on_playing_release(self, event):
+        if event.button == 1 and self.mouse_pressed:
+            if not any(ball.active for ball in self.balls):
+                ball = self.launch_ball()
+                if ball:
+                    known = getattr(ball, 'known', None)
+                    if self.quick_draw and known is not None:
+                        # Outcome is already known: settle the play now, nothing to fly
+                        if known.status == 'landed':
+                            self.finish_play(ball, self.resolve_landing(ball))
+                    else:
+                        self.balls.append(ball)
+                    if ball.launch_speed >= 0.5:
+                        self.launched_once = True
+                    received = getattr(event, 'received', None)
+                    if received is not None:
+                        # The ball is first drawn from the snapshot after this tick
+                        self.launch_frame = (received, self.ticks + 1)
+            self.mouse_pressed = False
+
+    def on_result_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            self.state = "playing"
+            self.balls = []
+            self.last_reward = None
+            self.result_timer = 0
+
+        if not self.launched_once:
+            self.launcher.power = self.launcher.max_power / 2
+        self.launched_once = False
+
+    def launch_ball(self):
+        if self.remote is None:
+            if self.launcher.power <= 0:
+                return None
+            if self.outcomes is not None:
+                # Launch on the table's power grid so the flight is the tabled one
+                self.launcher.power = self.outcomes.quantise(self.launcher.power)
+                if self.launcher.power <= 0:
+                    return None
+
+            known = None
+            if self.table_key is not None:
+                self.plays = self.prize_manager.claim_table_play(self.table_key)
+                if self.outcomes is not None and not self.outcomes.covers(self.plays):
+                    self.close_outcomes()
+                if self.outcomes is not None:
+                    known = self.outcomes.lookup(self.plays, self.launcher.power)
+            else:
+                self.plays += 1
+            power = self.launcher.power
+            ball, _ = self.launcher.launch(rng=play_rng(self.seed, self.plays))
+            ball.radius = self.board.ball_radius
+            ball.play = self.plays
+            ball.power = power
+            ball.known = known
+            return ball
+
+        power = self.launcher.power
+        self.launcher.power = 0.0
+        if power <= 0:
+            return None
+        # Returns at once; frames and the outcome stream in on the client's thread
+        ball = self.remote.launch(power)
+        ball.launch_speed = power / self.launcher.max_power
+        ball.play = None
+        ball.power = power
+        return ball
+
+    def close_outcomes(self):
+        # Table used up: later plays carry on past it, simulated as usual
+        print(f"Outcome table for seed {self.seed} is used up; quick draw is off")
+        self.outcomes.close()
+        self.outcomes = None
+        self.quick_draw = False
+
+    def resolve_landing(self, ball):
+        outcome = getattr(ball, 'outcome', None)
+        if outcome is not None:
+            # Server already decided and decremented stock
+            ball.play = outcome['play']
+            if outcome['awarded']:
+                return self.reward_slots[outcome['slot']]
+            return NO_PRIZE
+
+        known = getattr(ball, 'known', None)
+        slot = known.slot if known is not None else slot_index_at(ball.x, self.reward_slots)
+        if slot is not None:
+            prize_name = self.reward_slots[slot][0]
+            if self.prize_manager.award_prize(prize_name, self.session, ball.play):
+                self.update_forecast()
+                return self.reward_slots[slot]
+        return NO_PRIZE
+
+    def update_forecast(self, stock=None):
+        if self.forecaster is None:
+            return
+        if stock is not None:
+            # Preview of unsaved editor values; warnings follow saved stock only
+            self.stock_forecast = self.forecaster.forecast(stock)
+            return
+        self.stock_forecast = self.forecaster.forecast(self.prize_manager.prizes)
+        warnings = self.forecaster.warnings(self.stock_forecast)
+        if warnings != self.stock_warnings:
+            for line in warnings:
+                print(f"Stock warning: {line}")
+        self.stock_warnings = warnings
+
+    def handle_editor_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            # Clicking anywhere ends the current field, as Enter does
+            if self.selected_prize is not None:
+                self.commit_prize_field()
+
+            for prize_name, input_rect in self.prize_input_rects.items():
+                if input_rect.collidepoint(event.pos):
+                    self.select_prize_field(prize_name)
+
+            if self.save_button.rect.collidepoint(event.pos):
+                self.prize_manager.update_prizes(self.prize_edits)
+                self.close_prize_editor()
+            elif not self.editor_rect.collidepoint(event.pos):
+                # Close editor if clicking outside the box, dropping unsaved edits
+                self.close_prize_editor()
+
+        elif event.type == pygame.WINDOWEXPOSED:
+            self.editor_redraw = True
+
+        elif event.type == pygame.KEYDOWN and self.selected_prize is not None:
+            if event.key == pygame.K_RETURN:
+                self.commit_prize_field()
+            elif event.key == pygame.K_ESCAPE:
+                self.select_prize_field(None)
+            elif event.key == pygame.K_BACKSPACE:
+                self.temp_input = self.temp_input[:-1]
+                self.editor_dirty.add(self.selected_prize)
+            elif event.unicode.isnumeric():
+                self.temp_input += event.unicode
+                self.editor_dirty.add(self.selected_prize)
+
+    def open_prize_editor(self):
+        self.editing_prizes = True
+        self.prize_edits = {}
+        self.editor_redraw = True
+
+    def close_prize_editor(self):
+        self.select_prize_field(None)
+        self.editing_prizes = False
+        self.prize_edits = {}
+        self.update_forecast()
+
+    def select_prize_field(self, prize_name):
+        if self.selected_prize is not None:
+            self.editor_dirty.add(self.selected_prize)
+        if prize_name is None:
+            pygame.key.stop_text_input()
+            self.temp_input = None
+        else:
+            pygame.key.start_text_input()
+            self.temp_input = str(self.edited_stock()[prize_name])
+            self.editor_dirty.add(prize_name)
         self.selected_prize = prize_name
-        self.temp_input = current_value  # Initialize temp_input with current value
-        input_active = True
-        
-        while input_active:
-            for evt in pygame.event.get():
-                if evt.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-
-                if evt.type == pygame.KEYDOWN:
-                    if evt.key == pygame.K_RETURN:
-                        input_active = False
-                    elif evt.key == pygame.K_BACKSPACE:
-                        self.temp_input = self.temp_input[:-1]
-                    elif evt.key == pygame.K_ESCAPE:
-                        self.selected_prize = None
-                        self.temp_input = None  # Reset temp_input
-                        return None
-                    elif evt.unicode.isnumeric():
-                        self.temp_input += evt.unicode
-
-                elif evt.type == pygame.MOUSEBUTTONDOWN:
-                    # Click outside input box ends editing
-                    mouse_pos = evt.pos
-                    box_x = (SCREEN_WIDTH - 400) // 2
-                    box_y = (SCREEN_HEIGHT - 500) // 2
-                    input_rect = pygame.Rect(box_x + 200, box_y + 100 + list(self.prize_manager.prizes.keys()).index(prize_name) * 50, 100, 30)
-                    if not input_rect.collidepoint(mouse_pos):
-                        input_active = False
-            
-            # Redraw screen with current input
-            self.draw_splash_screen()
-            pygame.display.flip()
-            self.clock.tick(FPS)
-        
-        pygame.key.stop_text_input()
-        final_value = self.temp_input
-        self.selected_prize = None
-        self.temp_input = None  # Reset temp_input
-        return final_value
+
+    def commit_prize_field(self):
+        prize_name = self.selected_prize
+        try:
+            new_value = int(self.temp_input)
+            if new_value >= 0:
+                self.prize_edits[prize_name] = new_value
+                self.update_forecast(self.edited_stock())
+        except ValueError:
+            pass
+        self.select_prize_field(None)
+
+    def edited_stock(self):
+        return {**self.prize_manager.prizes, **self.prize_edits}
+
+    def finish_play(self, ball, reward):
+        self.last_reward = reward
+        self.recorded_outcomes.append(reward)
+        self.outcome_count += 1
+        print(f"Outcome {self.outcome_count}: {reward[0]} (play {ball.play}, power {ball.power!r})")
+
+        self.state = "result"
+        self.result_timer = pygame.time.get_ticks()
 
     def update(self):
+        self.ticks += 1
         if self.state == "playing":
             self.launcher.update(self.mouse_pressed)
 
             for ball in self.balls[:]:
                 ball.update(self.pegs)
-                if ball.y > SCREEN_HEIGHT - 100:
-                    base_slot_width = 80
-                    total_width = sum(base_slot_width * mult for _, _, _, mult in self.reward_slots)
-                    x_offset = (SCREEN_WIDTH - total_width) / 2
-
-                    reward_found = False
-                    current_x = x_offset
-                    for slot in self.reward_slots:
-                        slot_width = base_slot_width * slot[3]
-                        if current_x <= ball.x < current_x + slot_width:
-                            prize_name = slot[0]
-                            if self.prize_manager.get_prize_count(prize_name) > 0:
-                                self.last_reward = slot
-                                self.prize_manager.decrement_prize(prize_name)
-                            else:
-                                self.last_reward = ("No Prize", 0, COLORS['BLACK'], 1.0)
-                            reward_found = True  # <-- FIX: Mark reward as found
-                            break                # <-- FIX: Exit loop after assigning reward
-                        current_x += slot_width
-
-                    if not reward_found:
-                        self.last_reward = ("No Prize", 0, COLORS['BLACK'], 1.0)
+                if isinstance(ball, ReplayBall):
+                    if ball.error is not None:
+                        # Kiosk stays up; the next launch tries the server again
+                        self.balls.remove(ball)
+                        self.server_error = "Server unavailable - release again to retry"
+                        print(f"Server unavailable: {ball.error}")
+                        continue
+                    if ball.outcome is not None:
+                        self.server_error = None
+                        if not ball.outcome['name']:
+                            # Server says the ball never cleared the tube
+                            self.balls.remove(ball)
+                            continue
+                # Replayed balls end exactly where the server resolved them
+                landed = ball.finished if isinstance(ball, ReplayBall) else is_landed(ball)
+                if landed:
+                    reward = self.resolve_landing(ball)
 
                     try:
                         self.balls.remove(ball)
                     except ValueError:
                         pass
 
-                    self.recorded_outcomes.append(self.last_reward)
-                    print(f"Outcome {len(self.recorded_outcomes)}: {self.last_reward[0]}")
-
-                    self.state = "result"
-                    self.result_timer = pygame.time.get_ticks()
+                    self.finish_play(ball, reward)
 
-                elif ball.x < -200 or ball.x > SCREEN_WIDTH + 200 or ball.y < -200 or ball.y > SCREEN_HEIGHT + 400:
+                elif is_lost(ball):
                     try:
                         self.balls.remove(ball)
                     except ValueError:
@@ -486,40 +645,122 @@ class PlinkoGame:
                 self.last_reward = None
                 self.result_timer = 0
 
+        if self.recovery is not None:
+            self.recovery.maybe_save(self)
+
     def run(self):
+        if self.physics is not None:
+            self.physics.start()
+
         running = True
         while running:
-            events = pygame.event.get()
+            frame_start = time.perf_counter()
+            events = self.input.poll()
             for event in events:
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
+                    # Escape cancels an edited prize field before it quits
+                    if event.key == pygame.K_ESCAPE and self.selected_prize is None:
                         running = False
 
-            self.handle_events(events)
-            self.update()
-
-            if self.state == "splash":
-                self.draw_splash_screen()
-            elif self.state == "playing":
-                self.draw_game()
-            elif self.state == "result":
-                self.draw_game()
-                self.draw_result_screen()
-
-            pygame.display.flip()
+            if self.physics is None:
+                self.handle_events(events)
+                self.update()
+                snap = self.snapshot()
+            else:
+                # Splash/editor input stays on this thread; gameplay input goes to
+                # physics, including the rest of a batch once a click leaves the splash
+                for i, event in enumerate(events):
+                    if self.state != "splash":
+                        self.physics.post(events[i:])
+                        break
+                    self.handle_events([event])
+                # A dead physics thread would otherwise leave a frozen last frame
+                self.physics.check()
+                snap = self.physics.latest()
+
+            if snap.state == "splash" and self.editing_prizes:
+                # Only the fields that changed are pushed to the display
+                pygame.display.update(self.draw_prize_editor())
+            else:
+                if snap.state == "splash":
+                    self.draw_splash_screen()
+                elif snap.state == "playing":
+                    self.draw_game(snap)
+                elif snap.state == "result":
+                    self.draw_game(snap)
+                    self.draw_result_screen(snap)
+
+                pygame.display.flip()
+
+            # Press-to-launch latency ends once the launched ball is on screen
+            launch_frame = self.launch_frame
+            if launch_frame is not None and snap.tick >= launch_frame[1]:
+                self.input.record_latency(time.perf_counter() - launch_frame[0])
+                self.launch_frame = None
+            self.governor.record(time.perf_counter() - frame_start)
             self.clock.tick(FPS)
 
+        if self.physics is not None:
+            self.physics.stop()
+        if self.recovery is not None:
+            # Clean exit: nothing to resume next time
+            self.recovery.close(discard=True)
         self.prize_manager.close()
+        if self.outcomes is not None:
+            self.outcomes.close()
+        if self.remote is not None:
+            self.remote.close()
         pygame.quit()
         print(f"\nFinal outcomes with seed {self.seed}:")
-        for i, outcome in enumerate(self.recorded_outcomes, 1):
+        first = self.outcome_count - len(self.recorded_outcomes) + 1
+        for i, outcome in enumerate(self.recorded_outcomes, first):
             print(f"  {i}. {outcome[0]}")
+        latency = self.input.latency_summary()
+        if latency is not None:
+            print("Press-to-launch latency over %d launches: median %.1f ms, p95 %.1f ms, max %.1f ms" % latency)
         sys.exit()
 
 if __name__ == "__main__":
-    game = PlinkoGame()
+    parser = argparse.ArgumentParser(description="DOST 3 Plinko Reward Game")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--server', default=None, metavar='HOST:PORT',
+                        help="render-only kiosk backed by a core.server instance")
+    parser.add_argument('--threaded-physics', action='store_true',
+                        help="run physics on its own thread and draw published snapshots")
+    parser.add_argument('--recovery', default=os.path.join('db', 'recovery.snap'), metavar='PATH',
+                        help="crash-recovery snapshot to write and resume from")
+    parser.add_argument('--no-recovery', action='store_true')
+    parser.add_argument('--board', default=None, metavar='PATH',
+                        help="board TOML overriding the [board] table of gameconfig.toml")
+    parser.add_argument('--outcomes', default=OUTCOMES['path'], metavar='PATH',
+                        help="precomputed outcome table (python -m core.outcomes) to resolve plays from")
+    parser.add_argument('--quick-draw', action='store_true',
+                        help="settle each play from the outcome table on release, without the ball flight")
+    parser.add_argument('--quality', choices=('auto',) + QUALITY_NAMES, default='auto',
+                        help="render quality; 'auto' adapts it to the frame budget")
+    args = parser.parse_args()
+
+    server = None
+    if args.server:
+        host, _, port = args.server.rpartition(':')
+        server = (host or '127.0.0.1', int(port))
+
+    seed = args.seed
+    if args.quick_draw and seed is None:
+        # Quick draw needs the seed the outcome table was built for
+        try:
+            table = OutcomeTable(args.outcomes)
+            seed = table.seed
+            table.close()
+        except (OSError, ValueError):
+            pass
+
+    game = PlinkoGame(seed=seed, server=server, threaded_physics=args.threaded_physics,
+                      recovery_path=None if args.no_recovery else args.recovery,
+                      quality=None if args.quality == 'auto' else args.quality,
+                      board=load_board(args.board), outcomes=args.outcomes, quick_draw=args.quick_draw)
     game.run()
 
 